@@ -0,0 +1,14 @@
+"""Gunicorn settings for the update scheduler web service."""
+
+# One worker is enough: its threads keep the health check responsive while an
+# update is running. With more workers only one of them runs the hourly
+# update (see init_scheduler)
+workers = 1
+worker_class = 'gthread'
+threads = 8
+
+
+def post_worker_init(worker):
+    """Start the update scheduler once the worker has loaded the app."""
+    from src.scripts.scheduler import init_scheduler
+    init_scheduler()
@@ -9,14 +9,29 @@ class TimeOnMarketClient(BaseSupabaseClient):
     
     TABLE_NAME = "apartment_list_time_on_market"
     VIEW_NAME = "apartment_list_time_on_market_view"
+    INSERT_COLUMNS = [
+        'location_name', 'location_type', 'location_fips_code', 'population', 'state',
+        'county', 'metro', 'year_month', 'time_on_market'
+    ]
+    CONFLICT_COLUMNS = ['location_fips_code', 'year_month']
+    UPDATE_COLUMNS = ['time_on_market']
+    INTEGER_COLUMNS = ['population']
+    UPSERT_FUNCTION = "upsert_apartment_list_time_on_market_rows"
     
     def get_latest_year_month(self) -> Optional[str]:
         """
         Get the latest year_month from the database.
         
+        The value is cached for LATEST_CACHE_TTL_SECONDS and dropped when this
+        client writes to the table.
+        
         Returns:
             Optional[str]: Latest year_month in format 'YYYY_MM' or None if no data
         """
+        return self._cached_latest('get_latest_year_month', self._query_latest_year_month)
+    
+    def _query_latest_year_month(self) -> Optional[str]:
+        """Query the latest year_month from the table."""
         try:
             result = self.execute_sql(
                 f"""
@@ -55,6 +70,9 @@ class TimeOnMarketClient(BaseSupabaseClient):
         """
         Insert time on market records into database.
         
+        The view is not refreshed here; the scheduler refreshes changed views
+        once after all imports (see update_database_views).
+        
         Args:
             records: List of time on market records to insert
             
@@ -64,55 +82,49 @@ class TimeOnMarketClient(BaseSupabaseClient):
         Raises:
             DatabaseError: If insertion fails
         """
-        try:
-            # 准备批量插入的值
-            values_list = []
-            for record in records:
-                # 处理空值和字符串转义
-                processed_record = {
-                    key: self.process_record_value(value)
-                    for key, value in record.items()
-                }
-                
-                # 构建值字符串
-                values = f"""(
-                    {processed_record['location_name']}, 
-                    {processed_record['location_type']}, 
-                    {processed_record['location_fips_code']},
-                    {processed_record['population']}, 
-                    {processed_record['state']}, 
-                    {processed_record['county']}, 
-                    {processed_record['metro']}, 
-                    {processed_record['year_month']},
-                    {processed_record['time_on_market']}
-                )"""
-                values_list.append(values)
+        if not records:
+            return 0
             
-            # 构建批量插入SQL
-            query = f"""
-                INSERT INTO {self.TABLE_NAME} (
-                    location_name, location_type, location_fips_code,
-                    population, state, county, metro, year_month,
-                    time_on_market
-                ) VALUES 
-                {','.join(values_list)}
-                ON CONFLICT (location_fips_code, year_month) 
-                DO UPDATE SET
-                    time_on_market = CASE 
-                        WHEN EXCLUDED.time_on_market IS NOT NULL THEN EXCLUDED.time_on_market 
-                        ELSE {self.TABLE_NAME}.time_on_market 
-                    END
-            """
+        try:
+            if self.use_copy(records):
+                # Large batches skip SQL string building and are loaded with COPY
+                processed_count = self.copy_upsert(records)
+                logger.debug("Successfully copied %d time on market records", processed_count)
+                return processed_count
             
-            # 执行批量插入
-            self.execute_sql(query)
+            self.upsert_records(records)
             
-            # 刷新物化视图
-            self.refresh_materialized_view(self.VIEW_NAME)
-            logger.info(f"Successfully inserted {len(records)} time on market records")
+            logger.debug("Successfully inserted %d time on market records", len(records))
             
             return len(records)
             
         except Exception as e:
             logger.error(f"Failed to insert time on market records: {e}")
-            raise DatabaseError(f"Failed to insert time on market records: {e}") from e 
\ No newline at end of file
+            raise DatabaseError(f"Failed to insert time on market records: {e}") from e 
+    
+    def bulk_delete_by_fips(self, fips_codes: List[str]) -> int:
+        """
+        Delete all records for the given location FIPS codes in one request.
+        
+        Args:
+            fips_codes: Location FIPS codes to delete
+            
+        Returns:
+            int: Number of records deleted
+            
+        Raises:
+            DatabaseError: If deletion fails
+        """
+        if not fips_codes:
+            return 0
+            
+        try:
+            result = self.client.table(self.TABLE_NAME).delete(count='exact').in_(
+                'location_fips_code', list(fips_codes)
+            ).execute()
+            self.invalidate_latest()
+            return result.count or 0
+            
+        except Exception as e:
+            logger.error(f"Failed to delete time on market records: {e}")
+            raise DatabaseError(f"Failed to delete time on market records: {e}") from e
@@ -14,14 +14,29 @@ class VacancyIndexClient(BaseSupabaseClient):
     
     TABLE_NAME = "apartment_list_vacancy_index"
     VIEW_NAME = "apartment_list_vacancy_index_view"
+    INSERT_COLUMNS = [
+        'location_name', 'location_type', 'location_fips_code', 'population', 'state',
+        'county', 'metro', 'year_month', 'vacancy_index'
+    ]
+    CONFLICT_COLUMNS = ['location_fips_code', 'year_month']
+    UPDATE_COLUMNS = ['vacancy_index']
+    INTEGER_COLUMNS = ['population']
+    UPSERT_FUNCTION = "upsert_apartment_list_vacancy_index_rows"
     
     def get_latest_year_month(self) -> Optional[str]:
         """
         Get the latest year_month from the database.
         
+        The value is cached for LATEST_CACHE_TTL_SECONDS and dropped when this
+        client writes to the table.
+        
         Returns:
             Optional[str]: Latest year_month in format 'YYYY_MM' or None if no data
         """
+        return self._cached_latest('get_latest_year_month', self._query_latest_year_month)
+    
+    def _query_latest_year_month(self) -> Optional[str]:
+        """Query the latest year_month from the table."""
         try:
             result = self.execute_sql(
                 f"""
@@ -60,6 +75,9 @@ class VacancyIndexClient(BaseSupabaseClient):
         """
         Insert vacancy index records into database.
         
+        The view is not refreshed here; the scheduler refreshes changed views
+        once after all imports (see update_database_views).
+        
         Args:
             records: List of vacancy index records to insert
             
@@ -69,54 +87,20 @@ class VacancyIndexClient(BaseSupabaseClient):
         Raises:
             DatabaseError: If insertion fails
         """
-        try:
-            # 准备批量插入的值
-            values_list = []
-            for record in records:
-                # 处理空值和字符串转义
-                processed_record = {
-                    key: self.process_record_value(value)
-                    for key, value in record.items()
-                }
-                
-                # 构建值字符串
-                values = f"""(
-                    {processed_record['location_name']}, 
-                    {processed_record['location_type']}, 
-                    {processed_record['location_fips_code']},
-                    {processed_record['population']}, 
-                    {processed_record['state']}, 
-                    {processed_record['county']}, 
-                    {processed_record['metro']}, 
-                    {processed_record['year_month']},
-                    {processed_record['vacancy_index']}
-                )"""
-                values_list.append(values)
-            
-            # 构建批量插入SQL
-            query = f"""
-                INSERT INTO {self.TABLE_NAME} (
-                    location_name, location_type, location_fips_code,
-                    population, state, county, metro, year_month,
-                    vacancy_index
-                ) VALUES 
-                {','.join(values_list)}
-                ON CONFLICT (location_fips_code, year_month) 
-                DO UPDATE SET
-                    vacancy_index = CASE 
-                        WHEN EXCLUDED.vacancy_index IS NOT NULL THEN EXCLUDED.vacancy_index 
-                        ELSE {self.TABLE_NAME}.vacancy_index 
-                    END;
-            """
+        if not records:
+            return 0
             
-            # 执行批量插入
-            result = self.execute_sql(query)
+        try:
+            if self.use_copy(records):
+                # Large batches skip SQL string building and are loaded with COPY
+                processed_count = self.copy_upsert(records)
+                logger.debug("Successfully copied %d vacancy index records", processed_count)
+                return processed_count
             
-            # 刷新物化视图
-            self.refresh_materialized_view(self.VIEW_NAME)
+            self.upsert_records(records)
             
             processed_count = len(records)  # 使用实际处理的记录数
-            logger.info(f"Successfully inserted {processed_count} vacancy index records")
+            logger.debug("Successfully inserted %d vacancy index records", processed_count)
             
             return processed_count
             
@@ -1,33 +1,159 @@
 """Base Supabase client for database operations."""
 
+import abc
 import logging
-from typing import Any, Dict, List, Optional, Union
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import httpx
+import orjson
+import psycopg
+from postgrest.exceptions import APIError
+from psycopg_pool import ConnectionPool
 from supabase import Client, create_client
+from supabase.lib.client_options import ClientOptions
+from tenacity import before_sleep_log, retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 
 from ...utils.exceptions import DatabaseError
 
 logger = logging.getLogger(__name__)
 
-class BaseSupabaseClient:
+# Matches SELECT queries without copying (and upper-casing) multi-megabyte upsert statements
+_SELECT_RE = re.compile(r'\s*SELECT\b', re.IGNORECASE)
+
+@lru_cache(maxsize=None)
+def _get_shared_client(url: str, key: str) -> Client:
+    """
+    Get the process-wide Supabase client for a project URL and key.
+    
+    The client keeps a persistent HTTP session, so sharing it lets every table
+    client reuse the same keep-alive connections instead of opening new ones.
+    """
+    return create_client(url, key, options=ClientOptions(postgrest_client_timeout=60, schema='public'))
+
+# Long-lived direct connections, keyed by (DSN, slot); see _get_shared_connection
+_shared_connections: Dict[Tuple[str, int], psycopg.Connection] = {}
+_shared_connections_lock = threading.Lock()
+
+def _get_shared_connection(dsn: str, slot: int = 0) -> psycopg.Connection:
+    """
+    Get a process-wide autocommit Postgres connection for a DSN.
+    
+    Each slot is a separate connection (and server backend), so callers can
+    run statements in parallel by using one slot per thread. TCP keepalives
+    keep idle connections open between scheduled runs; a closed or broken
+    connection is replaced by a new one.
+    """
+    with _shared_connections_lock:
+        conn = _shared_connections.get((dsn, slot))
+        if conn is None or conn.closed or conn.broken:
+            conn = psycopg.connect(
+                dsn,
+                autocommit=True,
+                keepalives=1,
+                keepalives_idle=60,
+                keepalives_interval=10,
+                keepalives_count=5
+            )
+            _shared_connections[(dsn, slot)] = conn
+        return conn
+
+@lru_cache(maxsize=None)
+def _get_connection_pool(dsn: str) -> ConnectionPool:
+    """
+    Get the process-wide connection pool used for COPY loads.
+    
+    Concurrent import batches each borrow a connection instead of opening
+    (and TLS-negotiating) a new one per batch.
+    """
+    # Recycle connections every 30 minutes so pooler-side restarts don't leave stale ones
+    return ConnectionPool(conninfo=dsn, min_size=2, max_size=10, max_lifetime=1800, timeout=30)
+
+# Batches at least this large are loaded with COPY when a direct connection is configured
+COPY_MIN_RECORDS = 1000
+
+# Rows per raw_sql upsert statement; keeps each RPC body and server-side statement bounded
+UPSERT_CHUNK_SIZE = 1000
+
+# Chunks of one upsert_records call sent concurrently; the statements are idempotent upserts
+UPSERT_CONCURRENCY = 4
+
+# How long get_latest_* results are reused; writes through this client invalidate them early
+LATEST_CACHE_TTL_SECONDS = 60
+
+# Transport errors worth retrying: failed connects and connections the server dropped
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+
+
+def _dumps(records: List[Any]) -> str:
+    """Serialize records to JSON with orjson; NaN becomes null and unknown types fall back to str."""
+    return orjson.dumps(records, default=str, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+def _chunked(seq: List[Any], n: int) -> Iterator[List[Any]]:
+    """Yield consecutive slices of at most n items."""
+    for start in range(0, len(seq), n):
+        yield seq[start:start + n]
+
+
+class BaseSupabaseClient(abc.ABC):
     """Base client for interacting with Supabase database."""
     
-    def __init__(self, url: str, key: str) -> None:
+    # Upsert layout used by copy_upsert; set by table clients that support it
+    TABLE_NAME: str = ""
+    INSERT_COLUMNS: List[str] = []
+    CONFLICT_COLUMNS: List[str] = []
+    UPDATE_COLUMNS: List[str] = []
+    # INTEGER columns; their values may arrive as floats (e.g. 1000.0 once pandas saw a NaN)
+    INTEGER_COLUMNS: List[str] = []
+    # Server-side batch upsert function (see sql/create_upsert_functions.sql); empty to use raw_sql
+    UPSERT_FUNCTION: str = ""
+    
+    def __init__(self, url: str, key: str, db_dsn: Optional[str] = None) -> None:
         """
         Initialize base Supabase client.
         
         Args:
             url: Supabase project URL
             key: Supabase API key (anon or service role)
+            db_dsn: Optional direct Postgres connection string used for COPY loads
         """
         try:
-            self.client = create_client(url, key)
+            self.client = _get_shared_client(url, key)
             self.url = url
             self.key = key
+            self.db_dsn = db_dsn
+            self._latest_cache: Dict[str, Tuple[float, Optional[str]]] = {}
+            self._upsert_function_missing = False
             logger.info("Base Supabase client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Supabase client: {e}")
             raise DatabaseError(f"Failed to initialize Supabase client: {e}") from e
     
+    @retry(
+        retry=retry_if_exception_type(_RETRYABLE_ERRORS),
+        stop=stop_after_attempt(4),
+        wait=wait_random_exponential(multiplier=0.5, max=10),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True
+    )
+    def _rpc(self, function: str, params: Dict[str, Any]) -> Any:
+        """
+        Call a database function through the RPC endpoint.
+        
+        Failures to connect and connections dropped by the server are retried
+        with jittered exponential backoff, so one transient failure does not
+        fail the whole batch. Read timeouts are not retried: the statement may
+        still be running on the server (a long REFRESH MATERIALIZED VIEW, say),
+        and sending it again would only pile up on the same locks. Errors
+        reported by the database are not retried either.
+        """
+        return self.client.rpc(function, params).execute()
+    
     def execute_sql(self, query: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Execute SQL query using Supabase client.
@@ -53,13 +179,13 @@ class BaseSupabaseClient:
                     else:
                         query = query.replace(f":{key}", str(value))
             
-            result = self.client.rpc('raw_sql', {'command': query}).execute()
+            result = self._rpc('raw_sql', {'command': query})
             
             if result.data and isinstance(result.data, dict) and result.data.get('status') == 'error':
                 raise DatabaseError(f"SQL execution failed: {result.data.get('message')}")
             
             # For SELECT queries, return the result data
-            if query.strip().upper().startswith('SELECT'):
+            if _SELECT_RE.match(query):
                 if result.data and isinstance(result.data, list):
                     if len(result.data) == 1 and isinstance(result.data[0], dict):
                         return result.data[0]
@@ -73,6 +199,242 @@ class BaseSupabaseClient:
             logger.error(f"Failed to execute SQL query: {e}")
             raise DatabaseError(f"Failed to execute SQL query: {e}") from e
     
+    @abc.abstractmethod
+    def insert_records(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Insert records into the client's table.
+        
+        Table clients always return the number of records processed as an int
+        (0 for an empty batch), so import loops can sum the results directly.
+        
+        Args:
+            records: Records to insert
+            
+        Returns:
+            int: Number of records processed
+        """
+    
+    def _cached_latest(self, key: str, fetch: Callable[[], Optional[str]],
+                       ttl: float = LATEST_CACHE_TTL_SECONDS) -> Optional[str]:
+        """
+        Return a cached latest-date value, calling fetch when it is missing or stale.
+        
+        None is not cached, so an empty table or a failed lookup is retried.
+        
+        Args:
+            key: Cache key, normally the getter name
+            fetch: Function that queries the latest value
+            ttl: Seconds a cached value stays valid
+            
+        Returns:
+            Optional[str]: Latest value or None
+        """
+        cached = self._latest_cache.get(key)
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        value = fetch()
+        if value is not None:
+            self._latest_cache[key] = (time.monotonic(), value)
+        return value
+    
+    def invalidate_latest(self) -> None:
+        """Drop cached latest-date values after this client writes to its table."""
+        self._latest_cache.clear()
+    
+    def get_latest_dates(self) -> Dict[str, Optional[str]]:
+        """
+        Get the latest period loaded into every data table in one round-trip.
+        
+        Calls the latest_dates database function (sql/create_latest_dates_function.sql),
+        so callers checking several tables need one RPC instead of one query each.
+        
+        Returns:
+            Dict[str, Optional[str]]: Latest year_month or date per table name (None if empty)
+            
+        Raises:
+            DatabaseError: If the query fails
+        """
+        try:
+            result = self._rpc('latest_dates', {})
+            return {row['table_name']: row['latest'] for row in result.data or []}
+            
+        except Exception as e:
+            logger.error(f"Failed to get latest dates: {e}")
+            raise DatabaseError(f"Failed to get latest dates: {e}") from e
+    
+    def _dedupe(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Merge records that share the same CONFLICT_COLUMNS key.
+        
+        Later non-None values win, matching the COALESCE merge on the server.
+        Besides saving the duplicate work, this avoids the "ON CONFLICT DO
+        UPDATE command cannot affect row a second time" error that a repeated
+        key within one statement raises.
+        """
+        key_columns = self.CONFLICT_COLUMNS
+        merged: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        for record in records:
+            key = tuple(record.get(col) for col in key_columns)
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = record
+            else:
+                merged[key] = {**existing, **{k: v for k, v in record.items() if v is not None}}
+        if len(merged) < len(records):
+            logger.debug("Merged %d duplicate %s records", len(records) - len(merged), self.TABLE_NAME)
+            return list(merged.values())
+        return records
+    
+    def _coerce_integers(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Convert integral float values in INTEGER_COLUMNS to int.
+        
+        A pandas integer column with a missing value becomes float64, so its
+        values are serialized as e.g. 1000.0, which Postgres rejects as input
+        for an INTEGER column. Records needing no change are passed through
+        as they are; the others are copied, so the caller's records are not
+        modified.
+        """
+        integer_columns = self.INTEGER_COLUMNS
+        if not integer_columns:
+            return records
+        coerced = []
+        for record in records:
+            fixes = {}
+            for col in integer_columns:
+                value = record.get(col)
+                if isinstance(value, float) and value.is_integer():
+                    fixes[col] = int(value)
+            coerced.append({**record, **fixes} if fixes else record)
+        return coerced
+    
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _upsert_statement_parts(cls) -> Tuple[str, str]:
+        """
+        SQL before and after the JSON payload in the raw_sql upsert, built once per table client.
+        
+        The payload is concatenated between the two parts rather than
+        formatted in, so braces in the data need no escaping.
+        """
+        columns = ', '.join(cls.INSERT_COLUMNS)
+        update_clause = ', '.join(
+            f"{col} = COALESCE(EXCLUDED.{col}, {cls.TABLE_NAME}.{col})"
+            for col in cls.UPDATE_COLUMNS
+        )
+        return (
+            f"INSERT INTO {cls.TABLE_NAME} ({columns}) "
+            f"SELECT {columns} FROM jsonb_populate_recordset(NULL::{cls.TABLE_NAME}, '",
+            f"'::jsonb) ON CONFLICT ({', '.join(cls.CONFLICT_COLUMNS)}) DO UPDATE SET {update_clause}"
+        )
+    
+    def upsert_records(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Upsert records with a single INSERT ... SELECT over a JSON payload.
+        
+        The whole batch is sent as one JSON array and expanded on the server
+        with jsonb_populate_recordset, which takes the column types from the
+        table, so no per-value SQL literals are built. When UPSERT_FUNCTION is
+        set the chunk is passed to that function instead, as positional row
+        arrays in INSERT_COLUMNS order so column names are not repeated per
+        row; if it is not installed, raw_sql is used. Large batches are sent
+        as UPSERT_CHUNK_SIZE-row statements, up to UPSERT_CONCURRENCY at a
+        time. Existing values are kept when the new one is NULL, as in
+        copy_upsert.
+        
+        Args:
+            records: Records to upsert (keys beyond INSERT_COLUMNS are ignored)
+            
+        Returns:
+            int: Number of records processed
+            
+        Raises:
+            DatabaseError: If the upsert fails
+        """
+        statement_head, statement_tail = self._upsert_statement_parts()
+        
+        columns = self.INSERT_COLUMNS
+        
+        def upsert_chunk(chunk: List[Dict[str, Any]]) -> None:
+            if self.UPSERT_FUNCTION and not self._upsert_function_missing:
+                # Send positional rows in INSERT_COLUMNS order instead of repeating the column names per row
+                rows = [[record.get(col) for col in columns] for record in chunk]
+                try:
+                    # The prebuilt function keeps a cached plan, so no new SQL is parsed per batch
+                    self._rpc(self.UPSERT_FUNCTION, {'payload': _dumps(rows)})
+                    return
+                except APIError as e:
+                    if e.code != 'PGRST202':
+                        raise
+                    logger.warning(f"{self.UPSERT_FUNCTION} is not installed, falling back to raw_sql")
+                    self._upsert_function_missing = True
+            payload = _dumps(chunk)
+            self.execute_sql(statement_head + payload.replace("'", "''") + statement_tail)
+        
+        # Integer columns are fixed up once, before either the row arrays or the raw_sql fallback is built
+        chunks = list(_chunked(self._coerce_integers(self._dedupe(records)), UPSERT_CHUNK_SIZE))
+        if len(chunks) <= 1:
+            for chunk in chunks:
+                upsert_chunk(chunk)
+        else:
+            # Send the chunks concurrently so their network round trips overlap
+            with ThreadPoolExecutor(max_workers=min(UPSERT_CONCURRENCY, len(chunks))) as executor:
+                # list() re-raises the first chunk failure
+                list(executor.map(upsert_chunk, chunks))
+        self.invalidate_latest()
+        return len(records)
+    
+    def use_copy(self, records: List[Dict[str, Any]]) -> bool:
+        """Whether a batch should be loaded with COPY instead of the raw_sql RPC."""
+        return bool(self.db_dsn and self.INSERT_COLUMNS) and len(records) >= COPY_MIN_RECORDS
+    
+    def copy_upsert(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Upsert records through COPY into a temporary table on a pooled Postgres connection.
+        
+        Rows are streamed with COPY FROM STDIN and merged with a single
+        INSERT ... ON CONFLICT, which keeps existing values when the new one is NULL.
+        
+        Args:
+            records: Records to upsert (keys beyond INSERT_COLUMNS are ignored)
+            
+        Returns:
+            int: Number of records processed
+            
+        Raises:
+            DatabaseError: If the load fails
+        """
+        columns = ', '.join(self.INSERT_COLUMNS)
+        update_clause = ', '.join(
+            f"{col} = COALESCE(EXCLUDED.{col}, {self.TABLE_NAME}.{col})"
+            for col in self.UPDATE_COLUMNS
+        )
+        
+        try:
+            # The pool commits the transaction when the connection is returned
+            with _get_connection_pool(self.db_dsn).connection() as conn, conn.cursor() as cur:
+                cur.execute(
+                    f"CREATE TEMP TABLE tmp_import (LIKE {self.TABLE_NAME} INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+                with cur.copy(f"COPY tmp_import ({columns}) FROM STDIN") as copy:
+                    # COPY text format rejects 1000.0 for an INTEGER column, as INSERT does
+                    for record in self._coerce_integers(self._dedupe(records)):
+                        copy.write_row([record.get(col) for col in self.INSERT_COLUMNS])
+                cur.execute(
+                    f"""
+                    INSERT INTO {self.TABLE_NAME} ({columns})
+                    SELECT {columns} FROM tmp_import
+                    ON CONFLICT ({', '.join(self.CONFLICT_COLUMNS)})
+                    DO UPDATE SET {update_clause}
+                    """
+                )
+            self.invalidate_latest()
+            return len(records)
+            
+        except Exception as e:
+            logger.error(f"Failed to copy records into {self.TABLE_NAME}: {e}")
+            raise DatabaseError(f"Failed to copy records into {self.TABLE_NAME}: {e}") from e
+    
     def check_table_exists(self, table_name: str) -> bool:
         """
         Check if a table exists in the database.
@@ -100,26 +462,126 @@ class BaseSupabaseClient:
             logger.error(f"Failed to check table existence: {e}")
             return False
     
-    def refresh_materialized_view(self, view_name: str) -> None:
+    def refresh_materialized_view(self, view_name: str, concurrently: bool = True) -> None:
         """
         Refresh a specific materialized view.
         
+        By default the view is refreshed CONCURRENTLY so reads are not blocked
+        while it is rebuilt; this needs a unique index on the view (see
+        sql/create_view_unique_indexes.sql), so without one it falls back to a
+        plain refresh.
+        
         Args:
             view_name: Name of the materialized view to refresh
+            concurrently: Whether to try a concurrent refresh first
             
         Raises:
             DatabaseError: If refresh fails
         """
         try:
-            self.client.rpc('raw_sql', {
-                'command': f'REFRESH MATERIALIZED VIEW {view_name};'
-            }).execute()
-            logger.info(f"Successfully refreshed materialized view: {view_name}")
+            refreshed = False
+            if concurrently:
+                result = self._rpc('raw_sql', {
+                    'command': f'REFRESH MATERIALIZED VIEW CONCURRENTLY {view_name};'
+                })
+                refreshed = not (isinstance(result.data, dict) and result.data.get('status') == 'error')
+                if not refreshed:
+                    logger.debug(f"Concurrent refresh of {view_name} failed ({result.data.get('message')}), "
+                                 f"falling back to a plain refresh")
+            if not refreshed:
+                result = self._rpc('raw_sql', {
+                    'command': f'REFRESH MATERIALIZED VIEW {view_name};'
+                })
+                if isinstance(result.data, dict) and result.data.get('status') == 'error':
+                    raise DatabaseError(result.data.get('message'))
+            logger.debug("Successfully refreshed materialized view: %s", view_name)
             
         except Exception as e:
             logger.error(f"Failed to refresh materialized view {view_name}: {e}")
             raise DatabaseError(f"Failed to refresh materialized view {view_name}: {e}") from e
     
+    def refresh_materialized_views(self, view_names: List[str]) -> None:
+        """
+        Refresh several materialized views in a single raw_sql round-trip.
+        
+        All refreshes run in one DO block; each view is refreshed CONCURRENTLY
+        and falls back to a plain refresh, as in refresh_materialized_view.
+        The block runs in one transaction, so if any view fails none of them
+        is refreshed and the caller can retry them one by one.
+        
+        Args:
+            view_names: Names of the materialized views to refresh
+            
+        Raises:
+            DatabaseError: If any refresh fails
+        """
+        refresh_blocks = "\n".join(
+            f"BEGIN REFRESH MATERIALIZED VIEW CONCURRENTLY {view_name}; "
+            f"EXCEPTION WHEN others THEN REFRESH MATERIALIZED VIEW {view_name}; END;"
+            for view_name in view_names
+        )
+        try:
+            result = self._rpc('raw_sql', {
+                'command': f"DO $$ BEGIN\n{refresh_blocks}\nEND $$;"
+            })
+            if isinstance(result.data, dict) and result.data.get('status') == 'error':
+                raise DatabaseError(result.data.get('message'))
+            logger.info(f"Successfully refreshed materialized views: {', '.join(view_names)}")
+            
+        except Exception as e:
+            logger.error(f"Failed to refresh materialized views: {e}")
+            raise DatabaseError(f"Failed to refresh materialized views: {e}") from e
+    
+    def refresh_changed_materialized_views(self, view_names: List[str]) -> List[str]:
+        """
+        Refresh, in parallel, only the views whose base tables changed.
+        
+        Calls the refresh_changed_materialized_views database function
+        (sql/create_refresh_changed_views_function.sql). For each view it sums
+        the insert/update/delete counters of the view's base tables and
+        compares them with the sum stored in mv_refresh_log at its last
+        refresh; unchanged views are skipped, the others are refreshed as in
+        refresh_materialized_views and logged in the same transaction.
+        
+        The function is called once per view, in parallel, so the views are
+        rebuilt by separate backends at the same time instead of one after
+        another; with a direct connection configured each call uses its own
+        long-lived Postgres connection instead of the RPC endpoint.
+        
+        Args:
+            view_names: Names of the materialized views to refresh if changed
+            
+        Returns:
+            List[str]: Names of the views that were refreshed
+            
+        Raises:
+            DatabaseError: If the check or any refresh fails
+        """
+        def refresh_view(slot: int, view_name: str) -> List[str]:
+            if self.db_dsn:
+                row = _get_shared_connection(self.db_dsn, slot).execute(
+                    "SELECT refresh_changed_materialized_views(%s)", ([view_name],)
+                ).fetchone()
+                return row[0] or []
+            result = self._rpc(
+                'refresh_changed_materialized_views', {'view_names': [view_name]}
+            )
+            return result.data or []
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, len(view_names))) as executor:
+                refreshed = [
+                    view_name
+                    for view_refreshed in executor.map(refresh_view, range(len(view_names)), view_names)
+                    for view_name in view_refreshed
+                ]
+            logger.info(f"Refreshed changed materialized views: {', '.join(refreshed) or 'none'}")
+            return refreshed
+            
+        except Exception as e:
+            logger.error(f"Failed to refresh changed materialized views: {e}")
+            raise DatabaseError(f"Failed to refresh changed materialized views: {e}") from e
+    
     def process_record_value(self, value: Any) -> str:
         """
         Process a record value for SQL insertion.
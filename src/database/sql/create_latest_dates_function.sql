@@ -0,0 +1,20 @@
+-- Latest period loaded into each data table, in one round-trip
+-- (year_month for Apartment List tables, date for Zillow tables, both as text)
+CREATE OR REPLACE FUNCTION latest_dates()
+RETURNS TABLE(table_name TEXT, latest TEXT)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+AS $$
+    SELECT 'apartment_list_rent_estimates', MAX(year_month) FROM apartment_list_rent_estimates
+    UNION ALL
+    SELECT 'apartment_list_vacancy_index', MAX(year_month) FROM apartment_list_vacancy_index
+    UNION ALL
+    SELECT 'apartment_list_time_on_market', MAX(year_month) FROM apartment_list_time_on_market
+    UNION ALL
+    SELECT 'zillow_new_homeowner_affordability_down_20pct', MAX(date)::text FROM zillow_new_homeowner_affordability_down_20pct
+    UNION ALL
+    SELECT 'zillow_new_renter_affordability', MAX(date)::text FROM zillow_new_renter_affordability
+    UNION ALL
+    SELECT 'zillow_median_sale_price_all_home', MAX(date)::text FROM zillow_median_sale_price_all_home;
+$$;
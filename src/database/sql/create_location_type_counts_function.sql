@@ -0,0 +1,19 @@
+-- Row count per location_type of an Apartment List materialized view, grouped on the
+-- server so callers get the whole distribution in one small response instead of
+-- paging through every row (PostgREST caps responses at max-rows)
+CREATE OR REPLACE FUNCTION location_type_counts(view_name TEXT)
+RETURNS TABLE(location_type TEXT, record_count BIGINT)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+AS $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_matviews WHERE schemaname = 'public' AND matviewname = view_name) THEN
+        RAISE EXCEPTION 'Unknown materialized view: %', view_name;
+    END IF;
+    RETURN QUERY EXECUTE format(
+        'SELECT location_type::text, COUNT(*) FROM public.%I GROUP BY location_type ORDER BY 2 DESC',
+        view_name
+    );
+END;
+$$;
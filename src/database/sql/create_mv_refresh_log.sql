@@ -0,0 +1,8 @@
+-- Last refresh of each materialized view, used to skip refreshes when the view's
+-- base tables have not changed (see create_refresh_changed_views_function.sql)
+CREATE TABLE IF NOT EXISTS mv_refresh_log (
+    view_name TEXT PRIMARY KEY,
+    -- Sum of n_tup_ins + n_tup_upd + n_tup_del of the base tables at the last refresh
+    base_changes BIGINT NOT NULL,
+    refreshed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
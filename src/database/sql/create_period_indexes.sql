@@ -0,0 +1,10 @@
+-- Period indexes for the tables created outside this directory, so MAX(year_month) / MAX(date)
+-- (get_latest_*, latest_dates()) read one index entry instead of scanning the table.
+-- The other data tables already have them (see their create_*_table.sql); the ON CONFLICT
+-- keys are covered by each table's primary key.
+-- CONCURRENTLY does not block imports; run each statement on its own, outside a transaction.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_rent_estimates_year_month
+ON apartment_list_rent_estimates(year_month);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_zillow_renter_affordability_date
+ON zillow_new_renter_affordability(date);
@@ -0,0 +1,41 @@
+-- Refresh the given materialized views whose base tables changed since their last refresh
+-- (requires mv_refresh_log, see create_mv_refresh_log.sql); returns the refreshed views
+CREATE OR REPLACE FUNCTION refresh_changed_materialized_views(view_names TEXT[])
+RETURNS TEXT[]
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    v TEXT;
+    changes BIGINT;
+    refreshed TEXT[] := ARRAY[]::TEXT[];
+BEGIN
+    FOREACH v IN ARRAY view_names LOOP
+        -- Insert/update/delete counters of the tables the view reads from
+        SELECT COALESCE(SUM(s.n_tup_ins + s.n_tup_upd + s.n_tup_del), 0) INTO changes
+        FROM (
+            SELECT DISTINCT d.refobjid
+            FROM pg_rewrite r
+            JOIN pg_depend d ON d.classid = 'pg_rewrite'::regclass AND d.objid = r.oid
+            WHERE r.ev_class = v::regclass
+            AND d.refclassid = 'pg_class'::regclass
+            AND d.refobjid <> v::regclass
+        ) base
+        JOIN pg_stat_user_tables s ON s.relid = base.refobjid;
+        
+        IF changes IS DISTINCT FROM (SELECT base_changes FROM mv_refresh_log WHERE view_name = v) THEN
+            BEGIN
+                EXECUTE format('REFRESH MATERIALIZED VIEW CONCURRENTLY %I', v);
+            EXCEPTION WHEN others THEN
+                EXECUTE format('REFRESH MATERIALIZED VIEW %I', v);
+            END;
+            INSERT INTO mv_refresh_log (view_name, base_changes, refreshed_at)
+            VALUES (v, changes, NOW())
+            ON CONFLICT (view_name) DO UPDATE
+            SET base_changes = EXCLUDED.base_changes, refreshed_at = EXCLUDED.refreshed_at;
+            refreshed := array_append(refreshed, v);
+        END IF;
+    END LOOP;
+    RETURN refreshed;
+END;
+$$;
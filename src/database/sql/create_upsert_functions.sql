@@ -0,0 +1,160 @@
+-- Batch upsert functions, one per table, called through the PostgREST RPC endpoint.
+-- The rows arrive as one JSON-encoded string holding an array of row arrays, in the
+-- column order of the INSERT below (no keys repeated per row); each row is zipped with
+-- the column names and typed by the table's row type. The INTEGER column (population or
+-- size_rank) is read as numeric first, since a value from a pandas float column such as
+-- "1000.0" is not valid integer input. The plpgsql plan is cached per
+-- session instead of parsing a new INSERT for every batch. Existing values are kept
+-- when the new one is NULL.
+
+DROP FUNCTION IF EXISTS upsert_apartment_list_rent_estimates(JSONB);
+DROP FUNCTION IF EXISTS upsert_apartment_list_rent_estimates(TEXT);
+CREATE OR REPLACE FUNCTION upsert_apartment_list_rent_estimates_rows(payload TEXT)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    INSERT INTO apartment_list_rent_estimates (location_name, location_type, location_fips_code, population, state, county, metro, year_month, rent_estimate_overall, rent_estimate_1br, rent_estimate_2br)
+    SELECT x.location_name, x.location_type, x.location_fips_code, x.population, x.state, x.county, x.metro, x.year_month, x.rent_estimate_overall, x.rent_estimate_1br, x.rent_estimate_2br
+    FROM jsonb_array_elements(payload::jsonb) AS r(v)
+    CROSS JOIN LATERAL jsonb_populate_record(
+        NULL::apartment_list_rent_estimates,
+        jsonb_object(ARRAY['location_name', 'location_type', 'location_fips_code', 'population', 'state', 'county', 'metro', 'year_month', 'rent_estimate_overall', 'rent_estimate_1br', 'rent_estimate_2br'], ARRAY(SELECT CASE WHEN i = 4 THEN e::numeric::integer::text ELSE e END FROM jsonb_array_elements_text(r.v) WITH ORDINALITY AS t(e, i) ORDER BY i))
+    ) AS x
+    ON CONFLICT (location_fips_code, year_month)
+    DO UPDATE SET
+        rent_estimate_overall = COALESCE(EXCLUDED.rent_estimate_overall, apartment_list_rent_estimates.rent_estimate_overall),
+        rent_estimate_1br = COALESCE(EXCLUDED.rent_estimate_1br, apartment_list_rent_estimates.rent_estimate_1br),
+        rent_estimate_2br = COALESCE(EXCLUDED.rent_estimate_2br, apartment_list_rent_estimates.rent_estimate_2br);
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$;
+
+DROP FUNCTION IF EXISTS upsert_apartment_list_vacancy_index(JSONB);
+DROP FUNCTION IF EXISTS upsert_apartment_list_vacancy_index(TEXT);
+CREATE OR REPLACE FUNCTION upsert_apartment_list_vacancy_index_rows(payload TEXT)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    INSERT INTO apartment_list_vacancy_index (location_name, location_type, location_fips_code, population, state, county, metro, year_month, vacancy_index)
+    SELECT x.location_name, x.location_type, x.location_fips_code, x.population, x.state, x.county, x.metro, x.year_month, x.vacancy_index
+    FROM jsonb_array_elements(payload::jsonb) AS r(v)
+    CROSS JOIN LATERAL jsonb_populate_record(
+        NULL::apartment_list_vacancy_index,
+        jsonb_object(ARRAY['location_name', 'location_type', 'location_fips_code', 'population', 'state', 'county', 'metro', 'year_month', 'vacancy_index'], ARRAY(SELECT CASE WHEN i = 4 THEN e::numeric::integer::text ELSE e END FROM jsonb_array_elements_text(r.v) WITH ORDINALITY AS t(e, i) ORDER BY i))
+    ) AS x
+    ON CONFLICT (location_fips_code, year_month)
+    DO UPDATE SET
+        vacancy_index = COALESCE(EXCLUDED.vacancy_index, apartment_list_vacancy_index.vacancy_index);
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$;
+
+DROP FUNCTION IF EXISTS upsert_apartment_list_time_on_market(JSONB);
+DROP FUNCTION IF EXISTS upsert_apartment_list_time_on_market(TEXT);
+CREATE OR REPLACE FUNCTION upsert_apartment_list_time_on_market_rows(payload TEXT)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    INSERT INTO apartment_list_time_on_market (location_name, location_type, location_fips_code, population, state, county, metro, year_month, time_on_market)
+    SELECT x.location_name, x.location_type, x.location_fips_code, x.population, x.state, x.county, x.metro, x.year_month, x.time_on_market
+    FROM jsonb_array_elements(payload::jsonb) AS r(v)
+    CROSS JOIN LATERAL jsonb_populate_record(
+        NULL::apartment_list_time_on_market,
+        jsonb_object(ARRAY['location_name', 'location_type', 'location_fips_code', 'population', 'state', 'county', 'metro', 'year_month', 'time_on_market'], ARRAY(SELECT CASE WHEN i = 4 THEN e::numeric::integer::text ELSE e END FROM jsonb_array_elements_text(r.v) WITH ORDINALITY AS t(e, i) ORDER BY i))
+    ) AS x
+    ON CONFLICT (location_fips_code, year_month)
+    DO UPDATE SET
+        time_on_market = COALESCE(EXCLUDED.time_on_market, apartment_list_time_on_market.time_on_market);
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$;
+
+DROP FUNCTION IF EXISTS upsert_zillow_new_homeowner_affordability_down_20pct(JSONB);
+DROP FUNCTION IF EXISTS upsert_zillow_new_homeowner_affordability_down_20pct(TEXT);
+CREATE OR REPLACE FUNCTION upsert_zillow_new_homeowner_affordability_down_20pct_rows(payload TEXT)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    INSERT INTO zillow_new_homeowner_affordability_down_20pct (region_id, size_rank, region_name, region_type, state_name, date, new_home_affordability_down_20pct)
+    SELECT x.region_id, x.size_rank, x.region_name, x.region_type, x.state_name, x.date, x.new_home_affordability_down_20pct
+    FROM jsonb_array_elements(payload::jsonb) AS r(v)
+    CROSS JOIN LATERAL jsonb_populate_record(
+        NULL::zillow_new_homeowner_affordability_down_20pct,
+        jsonb_object(ARRAY['region_id', 'size_rank', 'region_name', 'region_type', 'state_name', 'date', 'new_home_affordability_down_20pct'], ARRAY(SELECT CASE WHEN i = 2 THEN e::numeric::integer::text ELSE e END FROM jsonb_array_elements_text(r.v) WITH ORDINALITY AS t(e, i) ORDER BY i))
+    ) AS x
+    ON CONFLICT (region_id, date)
+    DO UPDATE SET
+        new_home_affordability_down_20pct = COALESCE(EXCLUDED.new_home_affordability_down_20pct, zillow_new_homeowner_affordability_down_20pct.new_home_affordability_down_20pct);
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$;
+
+DROP FUNCTION IF EXISTS upsert_zillow_new_renter_affordability(JSONB);
+DROP FUNCTION IF EXISTS upsert_zillow_new_renter_affordability(TEXT);
+CREATE OR REPLACE FUNCTION upsert_zillow_new_renter_affordability_rows(payload TEXT)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    INSERT INTO zillow_new_renter_affordability (region_id, size_rank, region_name, region_type, state_name, date, new_renter_affordability)
+    SELECT x.region_id, x.size_rank, x.region_name, x.region_type, x.state_name, x.date, x.new_renter_affordability
+    FROM jsonb_array_elements(payload::jsonb) AS r(v)
+    CROSS JOIN LATERAL jsonb_populate_record(
+        NULL::zillow_new_renter_affordability,
+        jsonb_object(ARRAY['region_id', 'size_rank', 'region_name', 'region_type', 'state_name', 'date', 'new_renter_affordability'], ARRAY(SELECT CASE WHEN i = 2 THEN e::numeric::integer::text ELSE e END FROM jsonb_array_elements_text(r.v) WITH ORDINALITY AS t(e, i) ORDER BY i))
+    ) AS x
+    ON CONFLICT (region_id, date)
+    DO UPDATE SET
+        new_renter_affordability = COALESCE(EXCLUDED.new_renter_affordability, zillow_new_renter_affordability.new_renter_affordability);
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$;
+
+DROP FUNCTION IF EXISTS upsert_zillow_median_sale_price_all_home(JSONB);
+DROP FUNCTION IF EXISTS upsert_zillow_median_sale_price_all_home(TEXT);
+CREATE OR REPLACE FUNCTION upsert_zillow_median_sale_price_all_home_rows(payload TEXT)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    INSERT INTO zillow_median_sale_price_all_home (region_id, size_rank, region_name, region_type, state_name, date, median_sale_price_all_home)
+    SELECT x.region_id, x.size_rank, x.region_name, x.region_type, x.state_name, x.date, x.median_sale_price_all_home
+    FROM jsonb_array_elements(payload::jsonb) AS r(v)
+    CROSS JOIN LATERAL jsonb_populate_record(
+        NULL::zillow_median_sale_price_all_home,
+        jsonb_object(ARRAY['region_id', 'size_rank', 'region_name', 'region_type', 'state_name', 'date', 'median_sale_price_all_home'], ARRAY(SELECT CASE WHEN i = 2 THEN e::numeric::integer::text ELSE e END FROM jsonb_array_elements_text(r.v) WITH ORDINALITY AS t(e, i) ORDER BY i))
+    ) AS x
+    ON CONFLICT (region_id, date)
+    DO UPDATE SET
+        median_sale_price_all_home = COALESCE(EXCLUDED.median_sale_price_all_home, zillow_median_sale_price_all_home.median_sale_price_all_home);
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$;
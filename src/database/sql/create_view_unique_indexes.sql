@@ -0,0 +1,19 @@
+-- Unique indexes on the materialized views, required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+-- (the refresh then no longer blocks reads of the view)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_rent_estimates_view_unique
+ON apartment_list_rent_estimates_view(location_fips_code, year_month);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_vacancy_index_view_unique
+ON apartment_list_vacancy_index_view(location_fips_code, year_month);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_time_on_market_view_unique
+ON apartment_list_time_on_market_view(location_fips_code, year_month);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_zillow_affordability_view_unique
+ON zillow_new_homeowner_affordability_down_20pct_view(region_id, date);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_zillow_renter_affordability_view_unique
+ON zillow_new_renter_affordability_view(region_id, date);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_zillow_median_sale_price_view_unique
+ON zillow_median_sale_price_all_home_view(region_id, date);
\ No newline at end of file
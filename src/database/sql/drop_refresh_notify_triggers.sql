@@ -0,0 +1,11 @@
+-- Remove the mv_refresh_needed triggers installed by the former
+-- create_refresh_notify_triggers.sql; views are refreshed once at the end of each
+-- scheduled update (refresh_changed_materialized_views), and nothing listens any more
+DROP TRIGGER IF EXISTS trg_notify_mv_refresh ON apartment_list_rent_estimates;
+DROP TRIGGER IF EXISTS trg_notify_mv_refresh ON apartment_list_vacancy_index;
+DROP TRIGGER IF EXISTS trg_notify_mv_refresh ON apartment_list_time_on_market;
+DROP TRIGGER IF EXISTS trg_notify_mv_refresh ON zillow_new_homeowner_affordability_down_20pct;
+DROP TRIGGER IF EXISTS trg_notify_mv_refresh ON zillow_new_renter_affordability;
+DROP TRIGGER IF EXISTS trg_notify_mv_refresh ON zillow_median_sale_price_all_home;
+
+DROP FUNCTION IF EXISTS notify_mv_refresh_needed();
@@ -14,14 +14,29 @@ class HomeownerAffordabilityClient(BaseSupabaseClient):
     
     TABLE_NAME = "zillow_new_homeowner_affordability_down_20pct"
     VIEW_NAME = "zillow_new_homeowner_affordability_down_20pct_view"
+    INSERT_COLUMNS = [
+        'region_id', 'size_rank', 'region_name', 'region_type', 'state_name', 'date',
+        'new_home_affordability_down_20pct'
+    ]
+    CONFLICT_COLUMNS = ['region_id', 'date']
+    UPDATE_COLUMNS = ['new_home_affordability_down_20pct']
+    INTEGER_COLUMNS = ['size_rank']
+    UPSERT_FUNCTION = "upsert_zillow_new_homeowner_affordability_down_20pct_rows"
     
     def get_latest_date(self) -> Optional[str]:
         """
         Get the latest date from the database.
         
+        The value is cached for LATEST_CACHE_TTL_SECONDS and dropped when this
+        client writes to the table.
+        
         Returns:
             Optional[str]: Latest date in format 'YYYY-MM-DD' or None if no data
         """
+        return self._cached_latest('get_latest_date', self._query_latest_date)
+    
+    def _query_latest_date(self) -> Optional[str]:
+        """Query the latest date from the table."""
         try:
             result = self.execute_sql(
                 f"""
@@ -60,6 +75,9 @@ class HomeownerAffordabilityClient(BaseSupabaseClient):
         """
         Insert homeowner affordability records into database.
         
+        The view is not refreshed here; the scheduler refreshes changed views
+        once after all imports (see update_database_views).
+        
         Args:
             records: List of homeowner affordability records to insert
             
@@ -69,53 +87,20 @@ class HomeownerAffordabilityClient(BaseSupabaseClient):
         Raises:
             DatabaseError: If insertion fails
         """
-        try:
-            # 准备批量插入的值
-            values_list = []
-            for record in records:
-                # 处理空值和字符串转义
-                processed_record = {
-                    key: self.process_record_value(value)
-                    for key, value in record.items()
-                }
-                
-                # 构建值字符串
-                values = f"""(
-                    {processed_record['region_id']}, 
-                    {processed_record['size_rank']}, 
-                    {processed_record['region_name']},
-                    {processed_record['region_type']}, 
-                    {processed_record['state_name']}, 
-                    {processed_record['date']},
-                    {processed_record['new_home_affordability_down_20pct']}
-                )"""
-                values_list.append(values)
-            
-            # 构建批量插入SQL
-            query = f"""
-                INSERT INTO {self.TABLE_NAME} (
-                    region_id, size_rank, region_name,
-                    region_type, state_name, date,
-                    new_home_affordability_down_20pct
-                ) VALUES 
-                {','.join(values_list)}
-                ON CONFLICT (region_id, date) 
-                DO UPDATE SET
-                    new_home_affordability_down_20pct = CASE 
-                        WHEN EXCLUDED.new_home_affordability_down_20pct IS NOT NULL 
-                        THEN EXCLUDED.new_home_affordability_down_20pct 
-                        ELSE {self.TABLE_NAME}.new_home_affordability_down_20pct 
-                    END
-            """
+        if not records:
+            return 0
             
-            # 执行批量插入
-            result = self.execute_sql(query)
+        try:
+            if self.use_copy(records):
+                # Large batches skip SQL string building and are loaded with COPY
+                processed_count = self.copy_upsert(records)
+                logger.debug("Successfully copied %d homeowner affordability records", processed_count)
+                return processed_count
             
-            # 刷新物化视图
-            self.refresh_materialized_view(self.VIEW_NAME)
+            self.upsert_records(records)
             
             processed_count = len(records)
-            logger.info(f"Successfully inserted {processed_count} homeowner affordability records")
+            logger.debug("Successfully inserted %d homeowner affordability records", processed_count)
             
             return processed_count
             
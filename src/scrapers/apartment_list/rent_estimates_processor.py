@@ -13,6 +13,7 @@ from typing import Optional, Tuple
 import pandas as pd
 from tqdm import tqdm
 
+from ...utils.config import persist_processed_csv
 from ...utils.exceptions import DataValidationError
 
 logger = logging.getLogger(__name__)
@@ -144,7 +145,8 @@ class RentEstimatesProcessor:
         Process the rent estimates data.
         
         Returns:
-            Path: Path to the processed CSV file
+            Path: Path to the processed CSV file, or to the Parquet file if no
+            CSV copy is written
             
         Raises:
             DataValidationError: If data validation fails
@@ -167,7 +169,12 @@ class RentEstimatesProcessor:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_path = self.input_file.parent / f"rent_estimates_processed_{timestamp}.csv"
         
+        # The importer reads the Parquet file; the CSV copy is optional
+        if not persist_processed_csv():
+            output_path = output_path.with_suffix('.parquet')
         logger.info(f"Saving processed data to {output_path}")
-        df_processed.to_csv(output_path, index=False)
+        df_processed.to_parquet(output_path.with_suffix('.parquet'), index=False)
+        if output_path.suffix == '.csv':
+            df_processed.to_csv(output_path, index=False)
         
         return output_path 
\ No newline at end of file
@@ -21,6 +21,7 @@ from tqdm import tqdm
 
 from ...utils.config import Config
 from ...utils.exceptions import DataValidationError, ScrapingError
+from ...utils.http import DOWNLOAD_CHUNK_SIZE, get_session
 
 logger = logging.getLogger(__name__)
 
@@ -29,11 +30,15 @@ class TimeOnMarketScraper:
     
     BASE_URL = "https://www.apartmentlist.com/research/category/data-rent-estimates"
     
+    # The last extracted CSV URL is reused for this long, skipping the page fetch
+    CSV_URL_CACHE = Path("logs") / "time_on_market_csv_url.txt"
+    CSV_URL_CACHE_TTL = 3600
+    
     def __init__(self, config: Config):
         """Initialize the scraper with configuration."""
         self.config = config
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = get_session()
+        self.headers = {
             "User-Agent": config.user_agent,
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.5",
@@ -45,7 +50,7 @@ class TimeOnMarketScraper:
             "Sec-Fetch-Site": "none",
             "Sec-Fetch-User": "?1",
             "Cache-Control": "max-age=0"
-        })
+        }
         
     @retry(
         stop=stop_after_attempt(3),
@@ -65,7 +70,7 @@ class TimeOnMarketScraper:
             # Add a random delay
             time.sleep(self.config.scraping_delay)
             
-            response = self.session.get(self.BASE_URL, timeout=self.config.request_timeout)
+            response = self.session.get(self.BASE_URL, headers=self.headers, timeout=self.config.request_timeout)
             response.raise_for_status()
             
             # Save response for debugging
@@ -140,6 +145,33 @@ class TimeOnMarketScraper:
                             
         raise ScrapingError("Could not find time on market CSV URL in page source")
         
+    def _get_cached_csv_url(self) -> Optional[str]:
+        """
+        Get the CSV URL saved by a recent scrape if it is still reachable.
+        
+        Returns:
+            Optional[str]: The cached URL, or None if there is no fresh, reachable one
+        """
+        try:
+            age = time.time() - self.CSV_URL_CACHE.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        if age >= self.CSV_URL_CACHE_TTL:
+            return None
+            
+        url = self.CSV_URL_CACHE.read_text(encoding="utf-8").strip()
+        try:
+            response = self.session.head(url, headers=self.headers, allow_redirects=True,
+                                         timeout=self.config.request_timeout)
+            if response.ok:
+                return url
+            logger.debug(f"Cached CSV URL returned {response.status_code}, fetching page again")
+        except requests.RequestException as e:
+            logger.debug(f"Cached CSV URL check failed: {e}")
+            
+        self.CSV_URL_CACHE.unlink(missing_ok=True)
+        return None
+        
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10)
@@ -159,7 +191,7 @@ class TimeOnMarketScraper:
             # Add a random delay
             time.sleep(self.config.scraping_delay)
             
-            response = self.session.get(url, stream=True, timeout=self.config.request_timeout)
+            response = self.session.get(url, headers=self.headers, stream=True, timeout=self.config.request_timeout)
             response.raise_for_status()
             
             # Get file size for progress bar
@@ -175,7 +207,7 @@ class TimeOnMarketScraper:
                 unit='iB',
                 unit_scale=True
             ) as pbar:
-                for chunk in response.iter_content(chunk_size=8192):
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                     size = f.write(chunk)
                     pbar.update(size)
                     
@@ -269,22 +301,32 @@ class TimeOnMarketScraper:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_path = Path(self.config.data_dir) / f"time_on_market_{timestamp}.csv"
         
-        # Get page source and extract CSV URL
-        page_source = self._get_page_source()
-        
-        # Debug: Print page source length and save it
-        logger.info(f"Retrieved page source (length: {len(page_source)})")
-        debug_file = Path("logs") / "time_on_market_page_source.html"
-        with open(debug_file, "w", encoding="utf-8") as f:
-            f.write(page_source)
-        logger.debug(f"Page source saved to {debug_file}")
-        
-        csv_url = self._extract_csv_url(page_source)
-        
-        logger.info(f"Found time on market CSV URL: {csv_url}")
+        # Reuse a recently extracted CSV URL, otherwise get page source and extract it
+        csv_url = self._get_cached_csv_url()
+        if csv_url:
+            logger.info(f"Using cached time on market CSV URL: {csv_url}")
+        else:
+            page_source = self._get_page_source()
+            
+            # Debug: Print page source length and save it
+            logger.info(f"Retrieved page source (length: {len(page_source)})")
+            debug_file = Path("logs") / "time_on_market_page_source.html"
+            with open(debug_file, "w", encoding="utf-8") as f:
+                f.write(page_source)
+            logger.debug(f"Page source saved to {debug_file}")
+            
+            csv_url = self._extract_csv_url(page_source)
+            
+            logger.info(f"Found time on market CSV URL: {csv_url}")
         
-        # Download the CSV file
-        self._download_csv(csv_url, output_path)
+        # Download the CSV file; a URL that fails to download is not reused
+        try:
+            self._download_csv(csv_url, output_path)
+        except Exception:
+            self.CSV_URL_CACHE.unlink(missing_ok=True)
+            raise
+        self.CSV_URL_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        self.CSV_URL_CACHE.write_text(csv_url, encoding="utf-8")
         
         # Read and validate the data
         try:
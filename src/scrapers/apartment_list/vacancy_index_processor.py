@@ -13,6 +13,7 @@ from typing import Optional, Tuple
 import pandas as pd
 from tqdm import tqdm
 
+from ...utils.config import persist_processed_csv
 from ...utils.exceptions import DataValidationError
 
 logger = logging.getLogger(__name__)
@@ -138,7 +139,8 @@ class VacancyIndexProcessor:
         Process the vacancy index data.
         
         Returns:
-            Path: Path to the processed CSV file
+            Path: Path to the processed CSV file, or to the Parquet file if no
+            CSV copy is written
             
         Raises:
             DataValidationError: If data validation fails
@@ -158,7 +160,12 @@ class VacancyIndexProcessor:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_path = self.input_file.parent / f"vacancy_index_processed_{timestamp}.csv"
         
+        # The importer reads the Parquet file; the CSV copy is optional
+        if not persist_processed_csv():
+            output_path = output_path.with_suffix('.parquet')
         logger.info(f"Saving processed data to {output_path}")
-        df_long.to_csv(output_path, index=False)
+        df_long.to_parquet(output_path.with_suffix('.parquet'), index=False)
+        if output_path.suffix == '.csv':
+            df_long.to_csv(output_path, index=False)
         
         return output_path 
\ No newline at end of file
@@ -21,6 +21,7 @@ from tqdm import tqdm
 
 from ...utils.config import Config
 from ...utils.exceptions import DataValidationError, ScrapingError
+from ...utils.http import DOWNLOAD_CHUNK_SIZE, get_session
 
 logger = logging.getLogger(__name__)
 
@@ -32,8 +33,8 @@ class VacancyIndexScraper:
     def __init__(self, config: Config):
         """Initialize the scraper with configuration."""
         self.config = config
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = get_session()
+        self.headers = {
             "User-Agent": config.user_agent,
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.5",
@@ -45,7 +46,7 @@ class VacancyIndexScraper:
             "Sec-Fetch-Site": "none",
             "Sec-Fetch-User": "?1",
             "Cache-Control": "max-age=0"
-        })
+        }
         
     @retry(
         stop=stop_after_attempt(3),
@@ -65,7 +66,7 @@ class VacancyIndexScraper:
             # Add a random delay
             time.sleep(self.config.scraping_delay)
             
-            response = self.session.get(self.BASE_URL, timeout=self.config.request_timeout)
+            response = self.session.get(self.BASE_URL, headers=self.headers, timeout=self.config.request_timeout)
             response.raise_for_status()
             
             # Save response for debugging
@@ -161,7 +162,7 @@ class VacancyIndexScraper:
             # Add a random delay
             time.sleep(self.config.scraping_delay)
             
-            response = self.session.get(url, stream=True, timeout=self.config.request_timeout)
+            response = self.session.get(url, headers=self.headers, stream=True, timeout=self.config.request_timeout)
             response.raise_for_status()
             
             # Get file size for progress bar
@@ -177,7 +178,7 @@ class VacancyIndexScraper:
                 unit='iB',
                 unit_scale=True
             ) as pbar:
-                for chunk in response.iter_content(chunk_size=8192):
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                     size = f.write(chunk)
                     pbar.update(size)
                     
@@ -8,147 +8,192 @@ and prepares it for database insertion.
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List
 
+import numpy as np
 import pandas as pd
-from tqdm import tqdm
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 
+from ...utils.config import persist_processed_csv
 from ...utils.exceptions import DataValidationError
 
 logger = logging.getLogger(__name__)
 
+# Number of date columns converted to long format and written at a time
+DATES_PER_CHUNK = 24
+
+# Known types of the raw file's metadata columns; every other column holds monthly values
+RAW_COLUMN_TYPES = {
+    'RegionID': pa.int64(),
+    'SizeRank': pa.int64(),
+    'RegionName': pa.string(),
+    'RegionType': pa.string(),
+    'StateName': pa.string()
+}
+
+# Metadata columns of the raw file and their names in our schema, by position
+RAW_METADATA_COLUMNS = ('RegionID', 'SizeRank', 'RegionName', 'RegionType', 'StateName')
+METADATA_COLUMNS = ('region_id', 'size_rank', 'region_name', 'region_type', 'state_name')
+
 class AffordabilityProcessor:
     """Processor for Zillow new homeowner affordability data."""
-    
+
     def __init__(self):
         """Initialize the processor."""
         pass
-        
+
     def _read_data(self, input_file: Path) -> pd.DataFrame:
         """
-        Read the input CSV file.
-        
+        Read the wide raw file with explicit column types, so no column is type-inferred.
+
         Args:
             input_file: Path to the input CSV file
-            
+
         Returns:
             pd.DataFrame: The raw data
+
+        Raises:
+            DataValidationError: If a value does not match its column type
         """
         logger.info(f"Reading data from {input_file}")
-        return pd.read_csv(input_file)
-        
-    def _transform_data(self, df: pd.DataFrame) -> pd.DataFrame:
+        header = pd.read_csv(input_file, nrows=0).columns
+        column_types = {col: RAW_COLUMN_TYPES.get(col, pa.float64()) for col in header}
+        try:
+            # Parsed by PyArrow's multi-threaded reader
+            table = pacsv.read_csv(input_file, convert_options=pacsv.ConvertOptions(column_types=column_types))
+        except pa.ArrowInvalid as e:
+            raise DataValidationError(f"Unexpected value in raw data: {e}") from e
+        return table.to_pandas()
+
+    def _validate_data(self, df: pd.DataFrame) -> None:
         """
-        转换数据格式。
-        
+        验证数据格式和内容。
+
         Args:
             df: 原始数据DataFrame
-            
-        Returns:
-            pd.DataFrame: 转换后的数据
+
+        Raises:
+            DataValidationError: If validation fails
         """
-        # 复制基础列
-        base_cols = ['RegionID', 'RegionName', 'RegionType', 'StateName']
-        
-        # 识别日期列（除了基础列之外的所有列）
-        date_cols = [col for col in df.columns if col not in base_cols]
-        
-        # 将宽格式转换为长格式
-        df_long = df.melt(
-            id_vars=base_cols,
-            value_vars=date_cols,
-            var_name='Date',
-            value_name='new_home_affordability_down_20pct'
-        )
-        
-        # 转换日期格式
-        df_long['Date'] = pd.to_datetime(df_long['Date'], format='%m/%d/%Y')
-        
-        # 重命名列以匹配数据库格式
-        df_long = df_long.rename(columns={
-            'RegionID': 'region_id',
-            'RegionName': 'region_name',
-            'RegionType': 'region_type',
-            'StateName': 'state_name',
-            'Date': 'date'
-        })
-        
-        # 按region_id和date排序
-        df_long = df_long.sort_values(['region_id', 'date'])
-        
-        return df_long
-        
-    def _validate_transformed_data(self, df: pd.DataFrame) -> Tuple[bool, Optional[str]]:
+        # 检查必需列是否存在
+        missing_columns = set(RAW_METADATA_COLUMNS) - set(df.columns)
+        if missing_columns:
+            raise DataValidationError(f"缺少必需列: {sorted(missing_columns)}")
+
+        # 验证数据类型 (integer, unsigned or float)
+        if df['RegionID'].dtype.kind not in 'iuf':
+            raise DataValidationError("RegionID 必须是数字类型")
+        if df['SizeRank'].dtype.kind not in 'iuf':
+            raise DataValidationError("SizeRank 必须是数字类型")
+
+    def _to_long(self, df: pd.DataFrame, date_cols: List[str], date_labels: pd.Index) -> pd.DataFrame:
         """
-        验证转换后的数据。
-        
+        Convert some date columns of the wide frame to the long processed format.
+
         Args:
-            df: 转换后的数据
-            
+            df: Wide raw frame
+            date_cols: Date columns to convert
+            date_labels: Normalized YYYY-MM-DD label of each date column
+
         Returns:
-            Tuple[bool, Optional[str]]: (是否有效, 错误信息)
+            pd.DataFrame: Long frame sorted by date and size rank
         """
-        # 检查必需的列
-        required_cols = [
-            'region_id', 'region_name', 'region_type', 'state_name',
-            'date', 'new_home_affordability_down_20pct'
-        ]
-        
-        missing_cols = [col for col in required_cols if col not in df.columns]
-        if missing_cols:
-            return False, f"缺少必需的列: {missing_cols}"
-            
-        # 检查空值
-        for col in ['region_id', 'region_name', 'region_type', 'state_name', 'date']:
-            if df[col].isna().any():
-                return False, f"在必需列中发现空值: {col}"
-                
-        # 检查数据类型
-        try:
-            # 验证数值类型
-            df['region_id'] = df['region_id'].astype(str)
-            df['new_home_affordability_down_20pct'] = pd.to_numeric(df['new_home_affordability_down_20pct'])
-            
-            # 验证日期范围
-            min_date = df['date'].min()
-            max_date = df['date'].max()
-            if min_date.year < 2012 or max_date.year > 2025:
-                return False, f"日期范围无效: {min_date} 到 {max_date}"
-                
-        except (ValueError, TypeError) as e:
-            return False, f"数据类型验证失败: {str(e)}"
-            
-        return True, None
-        
+        # Convert from wide to long format with a NumPy reshape instead of
+        # pd.melt: one contiguous buffer per column, in melt's date-major order.
+        # Metadata columns are named after our schema as they are built, so no rename is needed
+        values = df[date_cols].to_numpy()
+        n_rows = len(df)
+        long_data = {col: np.tile(df[raw_col].to_numpy(), len(date_cols))
+                     for raw_col, col in zip(RAW_METADATA_COLUMNS, METADATA_COLUMNS)}
+        long_data['date'] = np.repeat(date_labels.to_numpy(dtype=object), n_rows)
+        long_data['new_home_affordability_down_20pct'] = values.ravel(order='F')
+        processed_df = pd.DataFrame(long_data, copy=False)
+
+        # Handle NaN and infinite values with a vectorized mask, keeping float64;
+        # NaN becomes null when converted to Arrow for writing
+        values = processed_df['new_home_affordability_down_20pct'].to_numpy(dtype=np.float64)
+        processed_df['new_home_affordability_down_20pct'] = np.where(np.isfinite(values), values, np.nan)
+
+        # Ensure correct data types in a single astype call; the low-cardinality
+        # text columns are stored as categories. region_name is read as a
+        # non-null string column and is left as is, avoiding a per-row pass
+        processed_df['state_name'] = processed_df['state_name'].fillna('')
+        processed_df = processed_df.astype({
+            'region_id': 'string',
+            'size_rank': 'int32',
+            'region_type': 'category',
+            'state_name': 'category'
+        }, copy=False)
+
+        # Sort by date and region on integer keys (a code per date label and the
+        # size rank) instead of comparing the date strings; lexsort is stable
+        date_codes = np.unique(date_labels.to_numpy(), return_inverse=True)[1]
+        order = np.lexsort((processed_df['size_rank'].to_numpy(), np.repeat(date_codes, n_rows)))
+        return processed_df.iloc[order]
+
     def process(self, input_file: Path) -> Path:
         """
         Process the affordability data.
-        
+
+        Date columns are converted and written DATES_PER_CHUNK at a time, in
+        date order, so only one chunk of the long frame is in memory and the
+        output stays sorted by date and region. Each chunk goes to the Parquet
+        file read by the importer and, with PERSIST_PROCESSED_CSV=1, as the same
+        Arrow table to PyArrow's CSV writer.
+
         Args:
             input_file: Path to the input CSV file
-            
+
         Returns:
-            Path: Path to the processed CSV file
-            
+            Path: Path to the processed CSV file, or to the Parquet file if no
+            CSV copy is written
+
         Raises:
             DataValidationError: If data validation fails
         """
-        # Read the data
+        # Read and validate the data
         df = self._read_data(input_file)
-        
-        # Transform the data
-        df_processed = self._transform_data(df)
-        
-        # Validate the transformed data
-        is_valid, error_msg = self._validate_transformed_data(df_processed)
-        if not is_valid:
-            raise DataValidationError(f"Transformed data validation failed: {error_msg}")
-            
+        self._validate_data(df)
+
+        # Get date columns
+        date_cols = [col for col in df.columns if col not in RAW_METADATA_COLUMNS]
+        if not date_cols:
+            raise DataValidationError("No date columns found")
+
+        # Dates are normalized once per header (YYYY-MM-DD) rather than once per long row
+        date_labels = pd.to_datetime(pd.Index(date_cols), format='%Y-%m-%d').strftime('%Y-%m-%d')
+
         # Save the processed data
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = input_file.parent / f"zillow_affordability_processed_{timestamp}.csv"
-        
-        logger.info(f"Saving processed data to {output_path}")
-        df_processed.to_csv(output_path, index=False)
-        
-        return output_path 
\ No newline at end of file
+        output_path = input_file.parent / f"processed_zillow_affordability_{timestamp}.csv"
+        # The importer reads the Parquet file; the CSV copy is optional
+        write_csv = persist_processed_csv()
+        if not write_csv:
+            output_path = output_path.with_suffix('.parquet')
+
+        date_order = np.argsort(date_labels.to_numpy(), kind='stable')
+        total_records = 0
+        csv_writer = parquet_writer = None
+        try:
+            for start in range(0, len(date_order), DATES_PER_CHUNK):
+                positions = date_order[start:start + DATES_PER_CHUNK]
+                processed_df = self._to_long(df, [date_cols[i] for i in positions], date_labels[positions])
+                table = pa.Table.from_pandas(processed_df, preserve_index=False)
+                if parquet_writer is None:
+                    parquet_writer = pq.ParquetWriter(output_path.with_suffix('.parquet'), table.schema)
+                    if write_csv:
+                        csv_writer = pacsv.CSVWriter(output_path, table.schema)
+                parquet_writer.write_table(table)
+                if csv_writer is not None:
+                    csv_writer.write_table(table)
+                total_records += len(processed_df)
+        finally:
+            if parquet_writer is not None:
+                parquet_writer.close()
+            if csv_writer is not None:
+                csv_writer.close()
+
+        logger.info(f"Successfully processed {total_records} records")
+        return output_path
\ No newline at end of file
@@ -12,6 +12,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Tuple, Optional
 
+from ...utils.config import persist_processed_csv
 from ...utils.exceptions import ProcessingError, DataValidationError
 
 logger = logging.getLogger(__name__)
@@ -209,7 +210,12 @@ class RenterAffordabilityProcessor:
             # 保存处理后的数据
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_path = Path("data") / f"processed_zillow_renter_affordability_{timestamp}.csv"
-            processed_df.to_csv(output_path, index=False)
+            # The importer reads the Parquet file; the CSV copy is optional
+            if not persist_processed_csv():
+                output_path = output_path.with_suffix('.parquet')
+            processed_df.to_parquet(output_path.with_suffix('.parquet'), index=False)
+            if output_path.suffix == '.csv':
+                processed_df.to_csv(output_path, index=False)
             
             self.logger.info(f"数据处理完成，保存到: {output_path}")
             return output_path
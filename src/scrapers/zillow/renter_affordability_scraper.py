@@ -19,6 +19,7 @@ from tqdm import tqdm
 
 from ...utils.config import Config
 from ...utils.exceptions import DataValidationError, ScrapingError
+from ...utils.http import DOWNLOAD_CHUNK_SIZE, get_session
 
 logger = logging.getLogger(__name__)
 
@@ -56,7 +57,7 @@ class RenterAffordabilityScraper:
         for path in ["logs", "data"]:
             Path(path).mkdir(exist_ok=True)
         
-        self.session = requests.Session()
+        self.session = get_session()
             
     @retry(
         stop=stop_after_attempt(5),
@@ -99,7 +100,7 @@ class RenterAffordabilityScraper:
             
             # 下载文件
             self.logger.info(f"正在从 {url} 下载文件")
-            response = requests.get(
+            response = self.session.get(
                 url,
                 headers=headers,
                 stream=True,
@@ -119,7 +120,7 @@ class RenterAffordabilityScraper:
                     unit_divisor=1024,
                     desc="下载进度"
                 ) as pbar:
-                    for data in response.iter_content(chunk_size=8192):
+                    for data in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                         size = f.write(data)
                         pbar.update(size)
             
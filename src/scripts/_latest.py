@@ -0,0 +1,74 @@
+"""Helper for locating the most recently modified data file in a directory."""
+
+import fnmatch
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+
+def latest(data_dir: Path, glob_pattern: str, exclude_substr: Optional[str] = None) -> Optional[Path]:
+    """
+    Find the most recently modified file in a directory matching a pattern.
+
+    The directory is scanned once with os.scandir, so each entry is stat'ed at
+    most once and no intermediate list of matches is built.
+
+    Args:
+        data_dir: Directory to scan (not recursive)
+        glob_pattern: Shell-style pattern matched against file names
+        exclude_substr: Skip files whose name contains this substring
+
+    Returns:
+        Optional[Path]: Path to the latest matching file, or None if nothing matches
+    """
+    latest_mtime = None
+    latest_path = None
+    # Literal suffix after the last wildcard (e.g. ".csv") gives a cheap pre-filter
+    suffix = re.split(r'[*?\]]', glob_pattern)[-1]
+
+    try:
+        with os.scandir(data_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith(suffix) or not fnmatch.fnmatchcase(name, glob_pattern):
+                    continue
+                if exclude_substr and exclude_substr in name:
+                    continue
+                if not entry.is_file():
+                    continue
+
+                mtime = entry.stat().st_mtime
+                if latest_mtime is None or mtime > latest_mtime:
+                    latest_mtime = mtime
+                    latest_path = entry.path
+    except FileNotFoundError:
+        return None
+
+    return Path(latest_path) if latest_path is not None else None
+
+
+def latest_processed(data_dir: Path, glob_pattern: str) -> Optional[Path]:
+    """
+    Find the newest processed file, whether it was written as Parquet or CSV.
+
+    The processors write Parquet and, with PERSIST_PROCESSED_CSV, a CSV copy
+    under the same timestamped name; a CSV can also be dropped in by hand.
+    The newest file across both suffixes wins, so an older Parquet file never
+    shadows a newer CSV. When both newest files share a name (one processor
+    run), the Parquet copy is used since it keeps the column types.
+
+    Args:
+        data_dir: Directory to scan (not recursive)
+        glob_pattern: Shell-style pattern without the suffix, e.g. "rent_estimates_processed_*"
+
+    Returns:
+        Optional[Path]: Path to the newest processed file, or None if there is none
+    """
+    parquet_file = latest(data_dir, f"{glob_pattern}.parquet")
+    csv_file = latest(data_dir, f"{glob_pattern}.csv")
+    if parquet_file is None or csv_file is None:
+        return parquet_file or csv_file
+    if parquet_file.stem == csv_file.stem:
+        return parquet_file
+    return parquet_file if parquet_file.stat().st_mtime >= csv_file.stat().st_mtime else csv_file
@@ -5,20 +5,21 @@ from pathlib import Path
 
 import pandas as pd
 
+from ._latest import latest_processed
+
 def main():
     """Main entry point for the processed data checking script."""
     # Get the most recent processed file
     data_dir = Path("data")
-    csv_files = list(data_dir.glob("rent_estimates_processed_*.csv"))
-    if not csv_files:
-        print("No processed CSV files found")
+    latest_file = latest_processed(data_dir, "rent_estimates_processed_*")
+    if latest_file is None:
+        print("No processed files found")
         return 1
         
-    latest_file = max(csv_files, key=lambda p: p.stat().st_mtime)
     print(f"Reading {latest_file}")
     
     # Read the data
-    df = pd.read_csv(latest_file)
+    df = pd.read_parquet(latest_file) if latest_file.suffix == '.parquet' else pd.read_csv(latest_file)
     
     # Print basic information
     print(f"\nShape: {df.shape}")
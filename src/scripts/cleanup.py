@@ -1,6 +1,8 @@
 """Script to clean up old data files."""
 
+import fnmatch
 import logging
+import os
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
@@ -30,11 +32,14 @@ def get_old_files(directory: Path, pattern: str, days: int) -> List[Path]:
     Returns:
         List[Path]: List of old files
     """
-    cutoff = datetime.now() - timedelta(days=days)
-    return [
-        f for f in directory.glob(pattern)
-        if f.stat().st_mtime < cutoff.timestamp()
-    ]
+    cutoff = (datetime.now() - timedelta(days=days)).timestamp()
+    old_files = []
+    # Single scandir pass: names are matched before any stat call is made
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if fnmatch.fnmatchcase(entry.name, pattern) and entry.stat().st_mtime < cutoff:
+                old_files.append(Path(entry.path))
+    return old_files
 
 def cleanup_data_files(data_dir: Path, retention_days: dict) -> None:
     """
@@ -91,6 +96,7 @@ def main():
             
             # 处理后的数据文件
             "*processed*.csv": 30,  # 30天
+            "*processed*.parquet": 30,
         }
         
         # 清理数据文件
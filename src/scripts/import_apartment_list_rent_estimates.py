@@ -3,33 +3,59 @@
 import logging
 import sys
 from pathlib import Path
+from typing import Optional
 import pandas as pd
 import numpy as np
+import pyarrow as pa
 from datetime import datetime
-from tqdm import tqdm
-import time
 
+from ..utils.batching import fit_batch_size, import_batches, to_records
 from ..utils.config import Config
+from ..utils.csv_reader import read_chunks
 from ..database.apartment_list.rent_estimates_client import RentEstimatesClient
 from ..utils.exceptions import ConfigurationError, DataImportError, DataValidationError
+from ..utils.logger import configure_once
+from ._latest import latest_processed
 
 # Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+configure_once()
 
 logger = logging.getLogger(__name__)
 
+# Explicit Arrow types for every column: the streaming reader infers untyped
+# columns from the first block only, so a later decimal or text value would
+# fail the import after earlier batches were committed. FIPS codes are kept
+# as written and population is read as float since it may be missing;
+# the client sends whole values to the INTEGER column as integers
+CSV_COLUMN_TYPES = {
+    'location_name': pa.string(),
+    'location_type': pa.string(),
+    'location_fips_code': pa.string(),
+    'population': pa.float64(),
+    'state': pa.string(),
+    'county': pa.string(),
+    'metro': pa.string(),
+    'year_month': pa.string(),
+    'rent_estimate_overall': pa.float64(),
+    'rent_estimate_1br': pa.float64(),
+    'rent_estimate_2br': pa.float64()
+}
+
 def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     """Clean data by handling NaN values and data types."""
-    logger.debug(f"Initial data shape: {df.shape}")
-    logger.debug(f"Columns: {df.columns.tolist()}")
+    # clean_data runs once per chunk, so skip building debug output unless it is shown
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug("Initial data shape: %s", df.shape)
+        logger.debug("Columns: %s", df.columns.tolist())
+    
+    # Drop duplicate primary keys (last one wins, as with the upsert) to save server work
+    duplicated = df.duplicated(subset=['location_fips_code', 'year_month'], keep='last')
+    if duplicated.any():
+        logger.info(f"Removed {duplicated.sum()} duplicate records")
+        df = df[~duplicated].copy()
     
-    # Handle NaN values
+    # Handle NaN and infinite values with a vectorized finiteness mask
     numeric_columns = [
         'rent_estimate_overall',
         'rent_estimate_1br',
@@ -37,30 +63,35 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
         'population'
     ]
     for col in numeric_columns:
-        df[col] = df[col].replace([np.inf, -np.inf, np.nan], None)
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        df[col] = np.where(np.isfinite(values), df[col].to_numpy(dtype=object), None)
     
-    # Ensure correct data types
+    # Ensure correct data types; text columns are already read as strings,
+    # so only the optional ones need their missing values filled (in one pass)
     df['location_fips_code'] = df['location_fips_code'].astype(str)
-    df['location_name'] = df['location_name'].astype(str)
-    df['location_type'] = df['location_type'].astype(str)
-    df['state'] = df['state'].fillna('').astype(str)
-    df['county'] = df['county'].fillna('').astype(str)
-    df['metro'] = df['metro'].fillna('').astype(str)
+    text_columns = ['state', 'county', 'metro']
+    df[text_columns] = df[text_columns].fillna('')
     
-    logger.debug("Data types after cleaning:")
-    for col in df.columns:
-        logger.debug(f"{col}: {df[col].dtype}")
+    if debug:
+        logger.debug("Data types after cleaning:")
+        for col in df.columns:
+            logger.debug("%s: %s", col, df[col].dtype)
     
     return df
 
-def import_data_in_batches(df: pd.DataFrame, client: RentEstimatesClient, batch_size: int = 500) -> int:
+def import_file_in_batches(input_file: Path, client: RentEstimatesClient, batch_size: int = 5000,
+                           concurrency: int = 1) -> int:
     """
-    Import data into Supabase in batches.
+    Stream a processed Parquet or CSV file into Supabase in batches.
+    
+    The file is read and cleaned in chunks of `batch_size` rows, and each chunk
+    is uploaded as soon as it is read, so memory stays bounded by the batch size.
     
     Args:
-        df: DataFrame to import
+        input_file: Processed Parquet or CSV file to import
         client: Supabase client
         batch_size: Number of records per batch
+        concurrency: Maximum number of batches uploaded concurrently
         
     Returns:
         int: Total number of records imported
@@ -68,94 +99,55 @@ def import_data_in_batches(df: pd.DataFrame, client: RentEstimatesClient, batch_
     Raises:
         DataImportError: If import fails after all retries
     """
-    total_imported = 0
-    total_rows = len(df)
-    max_retries = 3
-    retry_delay = 5  # seconds
-    
-    logger.info(f"Starting batch import of {total_rows} records")
-    logger.debug(f"Sample record: {df.iloc[0].to_dict() if len(df) > 0 else 'No records'}")
+    logger.info(f"Starting batch import from {input_file}")
     
-    with tqdm(total=total_rows, desc="Importing data") as pbar:
-        for start_idx in range(0, total_rows, batch_size):
-            end_idx = min(start_idx + batch_size, total_rows)
-            batch_df = df.iloc[start_idx:end_idx]
+    def read_batches():
+        for chunk in read_chunks(input_file, batch_size, column_types=CSV_COLUMN_TYPES):
+            chunk = clean_data(chunk)
             
-            # Handle NaN values
-            batch_df = batch_df.replace({float('nan'): None, 'nan': None})
-            
-            # Convert to records
-            records = batch_df.to_dict('records')
-            
-            # 重试机制
-            for retry in range(max_retries):
-                try:
-                    logger.debug(f"Attempting batch {start_idx//batch_size + 1} (Attempt {retry + 1}/{max_retries})")
-                    
-                    # Import data
-                    rows_imported = client.insert_records(records)
-                    total_imported += rows_imported
-                    pbar.update(rows_imported)
-                    
-                    logger.debug(f"Imported batch {start_idx//batch_size + 1}, "
-                               f"rows {start_idx+1} to {end_idx}, "
-                               f"imported {rows_imported} records")
-                    
-                    # 成功则跳出重试循环
-                    break
-                    
-                except Exception as e:
-                    if retry < max_retries - 1:
-                        logger.warning(f"Error importing batch {start_idx//batch_size + 1} "
-                                     f"(Attempt {retry + 1}/{max_retries}): {str(e)}")
-                        logger.warning(f"Retrying in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                    else:
-                        logger.error(f"Error importing batch {start_idx//batch_size + 1}: {str(e)}")
-                        logger.error(f"First record in failed batch: {records[0] if records else 'No records'}")
-                        raise DataImportError(f"Failed to import batch after {max_retries} attempts: {str(e)}")
+            # Handle NaN values and convert the chunk to records
+            records = to_records(chunk)
+            chunk_batch_size = fit_batch_size(records, batch_size)
+            for start_idx in range(0, len(records), chunk_batch_size):
+                yield records[start_idx:start_idx + chunk_batch_size]
     
-    return total_imported
+    # Upload up to `concurrency` batches at once; each batch retries with backoff
+    return import_batches(read_batches(), client.insert_records, concurrency=concurrency)
 
 def find_latest_processed_file(data_dir: Path) -> Path:
     """Find the latest processed rent estimates file."""
-    processed_files = list(data_dir.glob("rent_estimates_processed_*.csv"))
-    if not processed_files:
+    # Newest of the Parquet and CSV outputs (Parquet when both come from one run)
+    latest_file = latest_processed(data_dir, "rent_estimates_processed_*")
+    if latest_file is None:
         raise FileNotFoundError("No processed rent estimates files found")
-    latest_file = max(processed_files, key=lambda p: p.stat().st_mtime)
     logger.debug(f"Found latest file: {latest_file}")
     return latest_file
 
-def main() -> int:
+def main(config: Optional[Config] = None, client: Optional[RentEstimatesClient] = None) -> int:
     """Main entry point for importing data to Supabase."""
     try:
         # Load configuration
-        config = Config.from_env()
+        config = config or Config.from_env()
         logger.debug("Configuration loaded successfully")
         
         # Initialize Supabase client with service role key
-        if not config.supabase_service_role_key:
-            raise ConfigurationError("SUPABASE_SERVICE_ROLE_KEY is required for data import")
-            
-        client = RentEstimatesClient(
-            url=config.supabase_url,
-            key=config.supabase_service_role_key
-        )
+        if client is None:
+            if not config.supabase_service_role_key:
+                raise ConfigurationError("SUPABASE_SERVICE_ROLE_KEY is required for data import")
+            client = RentEstimatesClient(
+                url=config.supabase_url,
+                key=config.supabase_service_role_key,
+                db_dsn=config.database_dsn
+            )
         logger.debug("Supabase client initialized successfully")
         
         # Find latest processed file
         input_file = find_latest_processed_file(config.data_dir)
         logger.info(f"Processing file: {input_file}")
         
-        # Read and clean data
-        df = pd.read_csv(input_file)
-        logger.debug(f"Read {len(df)} records from file")
-        
-        df = clean_data(df)
-        logger.info(f"Found {len(df)} records to import")
-        
-        # Import data
-        total_imported = import_data_in_batches(df, client)
+        # Read, clean and import data chunk by chunk
+        total_imported = import_file_in_batches(input_file, client, batch_size=config.import_batch_size,
+                                                concurrency=config.import_concurrency)
         logger.info(f"Successfully imported {total_imported} records")
         
         return 0
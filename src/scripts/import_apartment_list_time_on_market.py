@@ -4,24 +4,19 @@ import logging
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
-import time
+from typing import List, Dict, Any, Optional
 
 import pandas as pd
-from tqdm import tqdm
 
 from ..database.apartment_list.time_on_market_client import TimeOnMarketClient
+from ..utils.batching import fit_batch_size, import_batches, to_records
 from ..utils.config import Config
-from ..utils.exceptions import ConfigurationError, DataValidationError, DataImportError
+from ..utils.exceptions import ConfigurationError, DataValidationError
+from ..utils.logger import configure_once
+from ._latest import latest, latest_processed
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+configure_once()
 
 logger = logging.getLogger(__name__)
 
@@ -40,15 +35,15 @@ def find_latest_processed_file(data_dir: Path) -> Path:
     """
     # 首先检查processed目录
     processed_dir = data_dir / 'processed'
-    if processed_dir.exists():
-        csv_files = list(processed_dir.glob("time_on_market_*.csv"))
-        if csv_files:
-            return max(csv_files, key=lambda p: p.stat().st_mtime)
+    latest_file = latest(processed_dir, "time_on_market_*.csv")
+    if latest_file is not None:
+        return latest_file
             
     # 如果processed目录没有文件，检查data目录
-    csv_files = list(data_dir.glob("time_on_market_processed_*.csv"))
-    if csv_files:
-        return max(csv_files, key=lambda p: p.stat().st_mtime)
+    # Newest of the Parquet and CSV outputs (Parquet when both come from one run)
+    latest_file = latest_processed(data_dir, "time_on_market_processed_*")
+    if latest_file is not None:
+        return latest_file
         
     raise FileNotFoundError(f"No processed time on market files found in {data_dir}")
 
@@ -82,10 +77,11 @@ def transform_data(df: pd.DataFrame) -> pd.DataFrame:
     
     # 处理数据类型和空值
     df_transformed['location_fips_code'] = df_transformed['location_fips_code'].astype(str)
-    df_transformed['population'] = df_transformed['population'].fillna(0).astype(int)
-    df_transformed['state'] = df_transformed['state'].fillna('').astype(str)
-    df_transformed['county'] = df_transformed['county'].fillna('').astype(str)
-    df_transformed['metro'] = df_transformed['metro'].fillna('').astype(str)
+    # Fill missing values of all optional columns in one call
+    fill_map = {'population': 0, 'state': '', 'county': '', 'metro': ''}
+    fill_columns = list(fill_map)
+    df_transformed[fill_columns] = df_transformed[fill_columns].fillna(fill_map).astype(
+        {'population': int, 'state': str, 'county': str, 'metro': str})
     
     # 添加last_update_time列（使用ISO格式字符串）
     df_transformed['last_update_time'] = datetime.utcnow().isoformat()
@@ -115,89 +111,61 @@ def validate_data(df: pd.DataFrame) -> None:
         
     # 检查必需字段的空值
     required_non_null = ['location_name', 'location_type', 'location_fips_code', 'year_month']
-    for col in required_non_null:
-        if df[col].isna().any():
-            raise DataValidationError(f"Found null values in required column: {col}")
+    has_nulls = df[required_non_null].isna().any()
+    if has_nulls.any():
+        raise DataValidationError(f"Found null values in required column: {has_nulls.idxmax()}")
             
-    # 验证year_month格式
-    invalid_dates = df[~df['year_month'].str.match(r'^\d{4}_\d{2}$')]
+    # 验证year_month格式（year_month 只有几十个不同值，只检查去重后的值）
+    year_months = pd.Series(df['year_month'].unique())
+    invalid_dates = year_months[~year_months.astype(str).str.match(r'^\d{4}_\d{2}$')]
     if not invalid_dates.empty:
-        raise DataValidationError(f"Found invalid year_month format: {invalid_dates['year_month'].unique()}")
+        raise DataValidationError(f"Found invalid year_month format: {invalid_dates.to_numpy()}")
         
-    # 验证time_on_market值（允许空值）
-    valid_values = df[df['time_on_market'].notna()]
-    if not valid_values.empty:
-        if (valid_values['time_on_market'] < 0).any():
-            raise DataValidationError("Found negative time on market values")
+    # 验证time_on_market值（允许空值；NaN 与 0 比较为 False，无需先过滤出非空行）
+    if (df['time_on_market'] < 0).any():
+        raise DataValidationError("Found negative time on market values")
 
-def import_data_in_batches(df: pd.DataFrame, client: TimeOnMarketClient, batch_size: int = 500) -> int:
+def import_data_in_batches(df: pd.DataFrame, client: TimeOnMarketClient, batch_size: int = 5000,
+                           concurrency: int = 1) -> int:
     """Import data into Supabase in batches."""
-    total_imported = 0
     total_rows = len(df)
-    max_retries = 3
-    retry_delay = 5  # seconds
     
     logger.info(f"Starting batch import of {total_rows} records")
-    logger.debug(f"Sample record: {df.iloc[0].to_dict() if len(df) > 0 else 'No records'}")
     
-    with tqdm(total=total_rows, desc="Importing data") as pbar:
+    # Size batches from a sample, then convert one batch at a time so only the
+    # batches in flight exist as dicts (NaN values are mapped to None)
+    sample_records = to_records(df.head(100))
+    batch_size = fit_batch_size(sample_records, batch_size)
+    logger.debug("Sample record: %s", sample_records[0] if sample_records else 'No records')
+    
+    def read_batches():
         for start_idx in range(0, total_rows, batch_size):
-            end_idx = min(start_idx + batch_size, total_rows)
-            batch_df = df.iloc[start_idx:end_idx]
-            
-            # Handle NaN values
-            batch_df = batch_df.replace({float('nan'): None, 'nan': None})
-            
-            # Convert to records
-            records = batch_df.to_dict('records')
-            
-            # 重试机制
-            for retry in range(max_retries):
-                try:
-                    logger.debug(f"Attempting batch {start_idx//batch_size + 1} (Attempt {retry + 1}/{max_retries})")
-                    
-                    # Import data
-                    rows_imported = client.insert_records(records)
-                    total_imported += rows_imported
-                    pbar.update(rows_imported)
-                    
-                    logger.debug(f"Imported batch {start_idx//batch_size + 1}, "
-                               f"rows {start_idx+1} to {end_idx}, "
-                               f"imported {rows_imported} records")
-                    
-                    # 成功则跳出重试循环
-                    break
-                    
-                except Exception as e:
-                    if retry < max_retries - 1:
-                        logger.warning(f"Error importing batch {start_idx//batch_size + 1} "
-                                     f"(Attempt {retry + 1}/{max_retries}): {str(e)}")
-                        logger.warning(f"Retrying in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                    else:
-                        logger.error(f"Error importing batch {start_idx//batch_size + 1}: {str(e)}")
-                        logger.error(f"First record in failed batch: {records[0] if records else 'No records'}")
-                        raise DataImportError(f"Failed to import batch after {max_retries} attempts: {str(e)}")
+            yield to_records(df.iloc[start_idx:start_idx + batch_size])
     
-    return total_imported
+    # Upload up to `concurrency` batches at once; each batch retries with backoff
+    return import_batches(read_batches(), client.insert_records, concurrency=concurrency, total=total_rows)
 
-def main() -> int:
+def main(config: Optional[Config] = None, client: Optional[TimeOnMarketClient] = None) -> int:
     """
     Main entry point for the ApartmentList time on market import script.
     
+    Args:
+        config: Loaded configuration; read from the environment if omitted
+        client: Client to import with; created from the configuration if omitted
+        
     Returns:
         int: Exit code (0 for success, 1 for failure)
     """
     try:
         # Load configuration
-        config = Config.from_env()
+        config = config or Config.from_env()
         
         # Find latest processed file
         input_file = find_latest_processed_file(config.data_dir)
         logger.info(f"Processing file: {input_file}")
         
         # Read and validate data
-        df = pd.read_csv(input_file)
+        df = pd.read_parquet(input_file) if input_file.suffix == '.parquet' else pd.read_csv(input_file, engine='pyarrow')
         
         # Transform data
         df_transformed = transform_data(df)
@@ -207,16 +175,18 @@ def main() -> int:
         logger.info(f"Data validation passed. Found {len(df_transformed)} records")
         
         # Initialize TimeOnMarketClient with service role key
-        if not config.supabase_service_role_key:
-            raise ConfigurationError("SUPABASE_SERVICE_ROLE_KEY is required for data import")
-            
-        client = TimeOnMarketClient(
-            url=config.supabase_url,
-            key=config.supabase_service_role_key
-        )
+        if client is None:
+            if not config.supabase_service_role_key:
+                raise ConfigurationError("SUPABASE_SERVICE_ROLE_KEY is required for data import")
+            client = TimeOnMarketClient(
+                url=config.supabase_url,
+                key=config.supabase_service_role_key,
+                db_dsn=config.database_dsn
+            )
         
         # Import data
-        total_imported = import_data_in_batches(df_transformed, client)
+        total_imported = import_data_in_batches(df_transformed, client, batch_size=config.import_batch_size,
+                                                concurrency=config.import_concurrency)
         logger.info(f"Successfully imported {total_imported} records")
         
         return 0
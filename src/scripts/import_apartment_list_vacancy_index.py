@@ -3,22 +3,18 @@
 import logging
 import sys
 from pathlib import Path
+from typing import Optional
 import pandas as pd
-from tqdm import tqdm
-import time
 
+from ..utils.batching import fit_batch_size, import_batches, to_records
 from ..utils.config import Config
-from ..utils.exceptions import ConfigurationError, DataValidationError, DataImportError
+from ..utils.exceptions import ConfigurationError, DataValidationError
+from ..utils.logger import configure_once
 from ..database.apartment_list.vacancy_index_client import VacancyIndexClient
+from ._latest import latest, latest_processed
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+configure_once()
 
 logger = logging.getLogger(__name__)
 
@@ -26,15 +22,15 @@ def find_latest_processed_file(data_dir: Path) -> Path:
     """Find the latest processed vacancy index file."""
     # 首先检查processed目录
     processed_dir = data_dir / 'processed'
-    if processed_dir.exists():
-        csv_files = list(processed_dir.glob("vacancy_index_processed_*.csv"))
-        if csv_files:
-            return max(csv_files, key=lambda p: p.stat().st_mtime)
+    latest_file = latest(processed_dir, "vacancy_index_processed_*.csv")
+    if latest_file is not None:
+        return latest_file
     
     # 如果processed目录没有文件，检查data目录
-    csv_files = list(data_dir.glob("vacancy_index_processed_*.csv"))
-    if csv_files:
-        return max(csv_files, key=lambda p: p.stat().st_mtime)
+    # Newest of the Parquet and CSV outputs (Parquet when both come from one run)
+    latest_file = latest_processed(data_dir, "vacancy_index_processed_*")
+    if latest_file is not None:
+        return latest_file
     
     raise FileNotFoundError(f"No processed vacancy index files found in {data_dir} or {processed_dir}")
 
@@ -50,10 +46,11 @@ def validate_data(df: pd.DataFrame) -> None:
     
     # 转换数据类型
     df['location_fips_code'] = df['location_fips_code'].astype(str)
-    df['population'] = df['population'].fillna(0).astype(int)
-    df['state'] = df['state'].fillna('').astype(str)
-    df['county'] = df['county'].fillna('').astype(str)
-    df['metro'] = df['metro'].fillna('').astype(str)
+    # Fill missing values of all optional columns in one call
+    fill_map = {'population': 0, 'state': '', 'county': '', 'metro': ''}
+    fill_columns = list(fill_map)
+    df[fill_columns] = df[fill_columns].fillna(fill_map).astype(
+        {'population': int, 'state': str, 'county': str, 'metro': str})
     
     # 检查必需字段是否有空值
     required_non_null = ['location_name', 'location_type', 'location_fips_code', 'year_month']
@@ -67,62 +64,31 @@ def validate_data(df: pd.DataFrame) -> None:
         if (valid_values['vacancy_index'] < 0).any() or (valid_values['vacancy_index'] > 1).any():
             raise DataValidationError("vacancy_index values must be between 0 and 1")
 
-def import_data_in_batches(df: pd.DataFrame, client: VacancyIndexClient, batch_size: int = 500) -> int:
+def import_data_in_batches(df: pd.DataFrame, client: VacancyIndexClient, batch_size: int = 5000,
+                           concurrency: int = 1) -> int:
     """Import data into Supabase in batches."""
-    total_imported = 0
     total_rows = len(df)
-    max_retries = 3
-    retry_delay = 5  # seconds
     
     logger.info(f"Starting batch import of {total_rows} records")
-    logger.debug(f"Sample record: {df.iloc[0].to_dict() if len(df) > 0 else 'No records'}")
     
-    with tqdm(total=total_rows, desc="Importing data") as pbar:
+    # Size batches from a sample, then convert one batch at a time so only the
+    # batches in flight exist as dicts (NaN values are mapped to None)
+    sample_records = to_records(df.head(100))
+    batch_size = fit_batch_size(sample_records, batch_size)
+    logger.debug("Sample record: %s", sample_records[0] if sample_records else 'No records')
+    
+    def read_batches():
         for start_idx in range(0, total_rows, batch_size):
-            end_idx = min(start_idx + batch_size, total_rows)
-            batch_df = df.iloc[start_idx:end_idx]
-            
-            # Handle NaN values
-            batch_df = batch_df.replace({float('nan'): None, 'nan': None})
-            
-            # Convert to records
-            records = batch_df.to_dict('records')
-            
-            # 重试机制
-            for retry in range(max_retries):
-                try:
-                    logger.debug(f"Attempting batch {start_idx//batch_size + 1} (Attempt {retry + 1}/{max_retries})")
-                    
-                    # Import data
-                    rows_imported = client.insert_records(records)
-                    total_imported += rows_imported
-                    pbar.update(rows_imported)
-                    
-                    logger.debug(f"Imported batch {start_idx//batch_size + 1}, "
-                               f"rows {start_idx+1} to {end_idx}, "
-                               f"imported {rows_imported} records")
-                    
-                    # 成功则跳出重试循环
-                    break
-                    
-                except Exception as e:
-                    if retry < max_retries - 1:
-                        logger.warning(f"Error importing batch {start_idx//batch_size + 1} "
-                                     f"(Attempt {retry + 1}/{max_retries}): {str(e)}")
-                        logger.warning(f"Retrying in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                    else:
-                        logger.error(f"Error importing batch {start_idx//batch_size + 1}: {str(e)}")
-                        logger.error(f"First record in failed batch: {records[0] if records else 'No records'}")
-                        raise DataImportError(f"Failed to import batch after {max_retries} attempts: {str(e)}")
+            yield to_records(df.iloc[start_idx:start_idx + batch_size])
     
-    return total_imported
+    # Upload up to `concurrency` batches at once; each batch retries with backoff
+    return import_batches(read_batches(), client.insert_records, concurrency=concurrency, total=total_rows)
 
-def main():
+def main(config: Optional[Config] = None, client: Optional[VacancyIndexClient] = None) -> int:
     """Main entry point for the ApartmentList vacancy index import script."""
     try:
         # Load configuration
-        config = Config.from_env()
+        config = config or Config.from_env()
         
         # Find latest processed file
         data_dir = Path(config.data_dir)
@@ -130,21 +96,23 @@ def main():
         logger.info(f"Processing file: {input_file}")
         
         # Read and validate data
-        df = pd.read_csv(input_file)
+        df = pd.read_parquet(input_file) if input_file.suffix == '.parquet' else pd.read_csv(input_file)
         validate_data(df)
         logger.info(f"Data validation passed. Found {len(df)} records")
         
         # Initialize Supabase client with service role key
-        if not config.supabase_service_role_key:
-            raise ConfigurationError("SUPABASE_SERVICE_ROLE_KEY is required for data import")
-            
-        client = VacancyIndexClient(
-            url=config.supabase_url,
-            key=config.supabase_service_role_key
-        )
+        if client is None:
+            if not config.supabase_service_role_key:
+                raise ConfigurationError("SUPABASE_SERVICE_ROLE_KEY is required for data import")
+            client = VacancyIndexClient(
+                url=config.supabase_url,
+                key=config.supabase_service_role_key,
+                db_dsn=config.database_dsn
+            )
         
         # Import data
-        total_imported = import_data_in_batches(df, client)
+        total_imported = import_data_in_batches(df, client, batch_size=config.import_batch_size,
+                                                concurrency=config.import_concurrency)
         logger.info(f"Successfully imported {total_imported} records")
         
         return 0
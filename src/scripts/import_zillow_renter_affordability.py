@@ -3,136 +3,133 @@
 import logging
 import sys
 from pathlib import Path
+from typing import Optional
 import pandas as pd
 import numpy as np
+import pyarrow as pa
 from datetime import datetime
-from tqdm import tqdm
 
+from ..utils.batching import fit_batch_size, import_batches, to_records
 from ..utils.config import Config
+from ..utils.csv_reader import read_chunks
 from ..database.zillow import RenterAffordabilityClient
 from ..utils.exceptions import ConfigurationError, DataImportError, DataValidationError
+from ..utils.logger import configure_once
+from ._latest import latest_processed
 
 # Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+configure_once()
 
 logger = logging.getLogger(__name__)
 
+# Column types applied while parsing so clean_data needs no astype passes
+CSV_COLUMN_TYPES = {
+    'region_id': pa.string(),
+    'size_rank': pa.int32(),
+    'region_name': pa.string(),
+    'region_type': pa.string(),
+    'state_name': pa.string(),
+    'date': pa.string(),
+    'new_renter_affordability': pa.float64()
+}
+
 def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     """Clean data by handling NaN values and data types."""
-    logger.debug(f"Initial data shape: {df.shape}")
-    logger.debug(f"Columns: {df.columns.tolist()}")
+    # clean_data runs once per chunk, so skip building debug output unless it is shown
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug("Initial data shape: %s", df.shape)
+        logger.debug("Columns: %s", df.columns.tolist())
+    
+    # Drop duplicate primary keys (last one wins, as with the upsert) to save server work
+    duplicated = df.duplicated(subset=['region_id', 'date'], keep='last')
+    if duplicated.any():
+        logger.info(f"Removed {duplicated.sum()} duplicate records")
+        df = df[~duplicated].copy()
     
-    # Handle NaN values
-    df['new_renter_affordability'] = df['new_renter_affordability'].replace([np.inf, -np.inf, np.nan], None)
+    # Handle NaN and infinite values (column dtypes are set when reading the CSV)
+    values = df['new_renter_affordability'].to_numpy()
+    df['new_renter_affordability'] = np.where(np.isfinite(values), values, None)
+    df['state_name'] = df['state_name'].fillna('')
     
-    # Ensure correct data types
-    df['region_id'] = df['region_id'].astype(str)
-    df['size_rank'] = df['size_rank'].astype(int)
-    df['region_name'] = df['region_name'].astype(str)
-    df['region_type'] = df['region_type'].astype(str)
-    df['state_name'] = df['state_name'].fillna('').astype(str)
+    # Convert missing text values to None once here so batches are sent as-is
+    text_columns = ['region_id', 'region_name', 'region_type']
+    df[text_columns] = df[text_columns].where(df[text_columns].notna(), None)
     
-    logger.debug("Data types after cleaning:")
-    for col in df.columns:
-        logger.debug(f"{col}: {df[col].dtype}")
+    if debug:
+        logger.debug("Data types after cleaning:")
+        for col in df.columns:
+            logger.debug("%s: %s", col, df[col].dtype)
     
     return df
 
-def import_data_in_batches(df: pd.DataFrame, client: RenterAffordabilityClient, batch_size: int = 1000) -> int:
+def import_file_in_batches(input_file: Path, client: RenterAffordabilityClient, batch_size: int = 5000,
+                           concurrency: int = 1) -> int:
     """
-    Import data into Supabase in batches.
+    Stream a processed Parquet or CSV file into Supabase in batches.
+    
+    The file is read and cleaned in chunks of `batch_size` rows, and each chunk
+    is uploaded as soon as it is read, so memory stays bounded by the batch size.
     
     Args:
-        df: DataFrame to import
+        input_file: Processed Parquet or CSV file to import
         client: Supabase client
         batch_size: Number of records per batch
+        concurrency: Maximum number of batches uploaded concurrently
         
     Returns:
         int: Total number of records imported
         
     Raises:
-        DataImportError: If import fails
+        DataImportError: If import fails after all retries
     """
-    total_imported = 0
-    total_rows = len(df)
+    logger.info(f"Starting batch import from {input_file}")
     
-    logger.info(f"Starting batch import of {total_rows} records")
-    logger.debug(f"Sample record: {df.iloc[0].to_dict() if len(df) > 0 else 'No records'}")
+    def read_batches():
+        for chunk in read_chunks(input_file, batch_size, column_types=CSV_COLUMN_TYPES,
+                                 strings_can_be_null=True):
+            records = to_records(clean_data(chunk))
+            chunk_batch_size = fit_batch_size(records, batch_size)
+            for start_idx in range(0, len(records), chunk_batch_size):
+                yield records[start_idx:start_idx + chunk_batch_size]
     
-    with tqdm(total=total_rows, desc="Importing data") as pbar:
-        for start_idx in range(0, total_rows, batch_size):
-            try:
-                end_idx = min(start_idx + batch_size, total_rows)
-                batch_df = df.iloc[start_idx:end_idx]
-                
-                # Handle NaN values
-                batch_df = batch_df.replace({float('nan'): None, 'nan': None})
-                
-                # Convert to records
-                records = batch_df.to_dict('records')
-                logger.debug(f"Batch {start_idx//batch_size + 1} sample: {records[0] if records else 'No records'}")
-                
-                # Import data using upsert
-                rows_imported = client.insert_records(records)
-                total_imported += rows_imported
-                pbar.update(rows_imported)
-                
-                logger.debug(f"Imported batch {start_idx//batch_size + 1}, "
-                           f"rows {start_idx+1} to {end_idx}, "
-                           f"imported {rows_imported} records")
-                
-            except Exception as e:
-                logger.error(f"Error importing batch {start_idx//batch_size + 1}: {str(e)}")
-                logger.error(f"First record in failed batch: {records[0] if records else 'No records'}")
-                raise DataImportError(f"Failed to import batch: {str(e)}") from e
-    
-    return total_imported
+    # Upload up to `concurrency` batches at once; each batch retries with backoff
+    return import_batches(read_batches(), client.insert_records, concurrency=concurrency)
 
 def find_latest_processed_file(data_dir: Path) -> Path:
     """Find the latest processed Zillow renter affordability file."""
-    processed_files = list(data_dir.glob("processed_zillow_renter_affordability_*.csv"))
-    if not processed_files:
+    # Newest of the Parquet and CSV outputs (Parquet when both come from one run)
+    latest_file = latest_processed(data_dir, "processed_zillow_renter_affordability_*")
+    if latest_file is None:
         raise FileNotFoundError("No processed Zillow renter affordability files found")
-    latest_file = max(processed_files, key=lambda p: p.stat().st_mtime)
     logger.debug(f"Found latest file: {latest_file}")
     return latest_file
 
-def main() -> int:
+def main(config: Optional[Config] = None, client: Optional[RenterAffordabilityClient] = None) -> int:
     """Main entry point for importing data to Supabase."""
     try:
         # Load configuration
-        config = Config.from_env()
+        config = config or Config.from_env()
         logger.debug("Configuration loaded successfully")
         
         # Initialize Supabase client with service role key
-        if not config.supabase_service_role_key:
-            raise ConfigurationError("SUPABASE_SERVICE_ROLE_KEY is required for data import")
-            
-        client = RenterAffordabilityClient(
-            url=config.supabase_url,
-            key=config.supabase_service_role_key
-        )
+        if client is None:
+            if not config.supabase_service_role_key:
+                raise ConfigurationError("SUPABASE_SERVICE_ROLE_KEY is required for data import")
+            client = RenterAffordabilityClient(
+                url=config.supabase_url,
+                key=config.supabase_service_role_key,
+                db_dsn=config.database_dsn
+            )
         logger.debug("Supabase client initialized successfully")
         
         # Find latest processed file
         input_file = find_latest_processed_file(config.data_dir)
         logger.info(f"Processing file: {input_file}")
         
-        # Read and clean data
-        df = pd.read_csv(input_file)
-        logger.debug(f"Read {len(df)} records from file")
-        
-        df = clean_data(df)
-        logger.info(f"Found {len(df)} records to import")
-        
-        # Import data
-        total_imported = import_data_in_batches(df, client)
+        # Read, clean and import data chunk by chunk
+        total_imported = import_file_in_batches(input_file, client, batch_size=config.import_batch_size,
+                                                concurrency=config.import_concurrency)
         logger.info(f"Successfully imported {total_imported} records")
         
         return 0
@@ -0,0 +1,160 @@
+"""Script to run several data pipeline jobs in one long-lived process."""
+
+import logging
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from ..database import (
+    RentEstimatesClient,
+    VacancyIndexClient,
+    TimeOnMarketClient,
+    HomeownerAffordabilityClient,
+    RenterAffordabilityClient,
+    MedianSalePriceClient
+)
+from ..utils.config import Config
+from ..utils.logger import configure_once
+from . import (
+    scrape_apartment_list_rent_estimates,
+    process_apartment_list_rent_estimates,
+    import_apartment_list_rent_estimates,
+    scrape_apartment_list_vacancy_index,
+    process_apartment_list_vacancy_index,
+    import_apartment_list_vacancy_index,
+    scrape_apartment_list_time_on_market,
+    process_apartment_list_time_on_market,
+    import_apartment_list_time_on_market,
+    scrape_zillow_affordability,
+    process_zillow_affordability,
+    import_zillow_affordability,
+    scrape_zillow_renter_affordability,
+    process_zillow_renter_affordability,
+    import_zillow_renter_affordability,
+    scrape_zillow_median_sale_price,
+    process_zillow_median_sale_price,
+    import_zillow_median_sale_price
+)
+
+# Configure logging
+configure_once()
+
+logger = logging.getLogger(__name__)
+
+# Job name -> script module, in the order of a full update
+JOBS = {
+    'scrape_apartment_list_rent_estimates': scrape_apartment_list_rent_estimates,
+    'process_apartment_list_rent_estimates': process_apartment_list_rent_estimates,
+    'import_apartment_list_rent_estimates': import_apartment_list_rent_estimates,
+    'scrape_apartment_list_vacancy_index': scrape_apartment_list_vacancy_index,
+    'process_apartment_list_vacancy_index': process_apartment_list_vacancy_index,
+    'import_apartment_list_vacancy_index': import_apartment_list_vacancy_index,
+    'scrape_apartment_list_time_on_market': scrape_apartment_list_time_on_market,
+    'process_apartment_list_time_on_market': process_apartment_list_time_on_market,
+    'import_apartment_list_time_on_market': import_apartment_list_time_on_market,
+    'scrape_zillow_affordability': scrape_zillow_affordability,
+    'process_zillow_affordability': process_zillow_affordability,
+    'import_zillow_affordability': import_zillow_affordability,
+    'scrape_zillow_renter_affordability': scrape_zillow_renter_affordability,
+    'process_zillow_renter_affordability': process_zillow_renter_affordability,
+    'import_zillow_renter_affordability': import_zillow_renter_affordability,
+    'scrape_zillow_median_sale_price': scrape_zillow_median_sale_price,
+    'process_zillow_median_sale_price': process_zillow_median_sale_price,
+    'import_zillow_median_sale_price': import_zillow_median_sale_price
+}
+
+# Client class used by each import job
+IMPORT_CLIENTS = {
+    'import_apartment_list_rent_estimates': RentEstimatesClient,
+    'import_apartment_list_vacancy_index': VacancyIndexClient,
+    'import_apartment_list_time_on_market': TimeOnMarketClient,
+    'import_zillow_affordability': HomeownerAffordabilityClient,
+    'import_zillow_renter_affordability': RenterAffordabilityClient,
+    'import_zillow_median_sale_price': MedianSalePriceClient
+}
+
+def run(jobs: List[str], config: Optional[Config] = None,
+        clients: Optional[Dict[str, object]] = None) -> List[Tuple[str, bool]]:
+    """
+    Run pipeline jobs in order inside the current process.
+
+    Configuration is loaded once and every import job gets a client built from
+    it, so interpreter start-up, module imports and the Supabase connection are
+    shared by all jobs instead of being paid once per script.
+
+    Args:
+        jobs: Names of the jobs to run (keys of JOBS)
+        config: Loaded configuration; read from the environment if omitted
+        clients: Import job name -> client to reuse across calls; clients
+            missing from it are built here and added to it
+
+    Returns:
+        List[Tuple[str, bool]]: (job, success) for each job
+
+    Raises:
+        ValueError: If a job name is unknown
+    """
+    unknown_jobs = [job for job in jobs if job not in JOBS]
+    if unknown_jobs:
+        raise ValueError(f"Unknown jobs: {unknown_jobs}")
+
+    config = config or Config.from_env()
+    if clients is None:
+        clients = {}
+
+    results = []
+    for job in jobs:
+        logger.info(f"Running {job}...")
+        module = JOBS[job]
+        try:
+            if job in IMPORT_CLIENTS:
+                # Without the service role key, let the import job report the configuration error
+                if job not in clients and config.supabase_service_role_key:
+                    clients[job] = IMPORT_CLIENTS[job](
+                        url=config.supabase_url,
+                        key=config.supabase_service_role_key,
+                        db_dsn=config.database_dsn
+                    )
+                exit_code = module.main(config=config, client=clients.get(job))
+            elif job.startswith('scrape_'):
+                exit_code = module.main(config=config)
+            else:
+                exit_code = module.main()
+        except Exception:
+            logger.exception(f"Unexpected error in {job}")
+            exit_code = 1
+
+        success = exit_code == 0
+        if success:
+            logger.info(f"{job} completed successfully")
+        else:
+            logger.error(f"{job} failed")
+        results.append((job, success))
+
+    return results
+
+def main() -> int:
+    """
+    Main entry point for the pipeline runner.
+
+    Jobs are taken from the command line; without arguments all jobs are run.
+
+    Returns:
+        int: Exit code (0 if all jobs succeeded, 1 otherwise)
+    """
+    jobs = sys.argv[1:] or list(JOBS)
+    try:
+        results = run(jobs)
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+
+    failed_jobs = [job for job, success in results if not success]
+    if failed_jobs:
+        logger.error(f"Failed jobs: {failed_jobs}")
+        return 1
+
+    logger.info(f"All {len(results)} jobs completed successfully")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -6,15 +6,11 @@ from pathlib import Path
 
 from ..scrapers.apartment_list.rent_estimates_processor import RentEstimatesProcessor
 from ..utils.exceptions import ProcessingError, DataValidationError
+from ..utils.logger import configure_once
+from ._latest import latest
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+configure_once()
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +18,10 @@ def find_latest_raw_file() -> Path:
     """Find the latest raw rent estimates file in the data directory."""
     data_dir = Path("data")
     # 只查找原始文件，不包含 "processed" 的文件
-    raw_files = [f for f in data_dir.glob("rent_estimates_2*.csv") 
-                if "processed" not in f.name]
-    
-    if not raw_files:
+    latest_file = latest(data_dir, "rent_estimates_2*.csv", exclude_substr="processed")
+    if latest_file is None:
         raise FileNotFoundError("No raw rent estimates files found")
-        
-    return max(raw_files, key=lambda p: p.stat().st_mtime)
+    return latest_file
 
 def main():
     """Main entry point for the ApartmentList rent estimates processing script."""
@@ -6,15 +6,11 @@ from pathlib import Path
 
 from ..scrapers.apartment_list.time_on_market_processor import TimeOnMarketProcessor
 from ..utils.exceptions import DataValidationError, ProcessingError
+from ..utils.logger import configure_once
+from ._latest import latest
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+configure_once()
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +18,9 @@ def find_latest_raw_file() -> Path:
     """Find the latest raw time on market file in the data directory."""
     data_dir = Path("data")
     # 只查找原始文件，不包含 "processed" 的文件
-    raw_files = [f for f in data_dir.glob("time_on_market_2*.csv") 
-                if "processed" not in f.name]
-    
-    if not raw_files:
+    latest_file = latest(data_dir, "time_on_market_2*.csv", exclude_substr="processed")
+    if latest_file is None:
         raise FileNotFoundError("No raw time on market files found in data directory")
-        
-    latest_file = max(raw_files, key=lambda x: x.stat().st_mtime)
     return latest_file
 
 def main():
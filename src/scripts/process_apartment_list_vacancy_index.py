@@ -11,24 +11,21 @@ from ..utils.exceptions import (
     DataValidationError,
     ProcessingError,
 )
+from ..utils.logger import configure_once
+from ._latest import latest
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+configure_once()
 logger = logging.getLogger(__name__)
 
 def find_latest_raw_file() -> Path:
     """Find the latest raw vacancy index file in the data directory."""
     data_dir = Path("data")
     # 只查找原始文件，不包含 "processed" 的文件
-    raw_files = [f for f in data_dir.glob("vacancy_index_2*.csv") 
-                if "processed" not in f.name]
-    
-    if not raw_files:
+    latest_file = latest(data_dir, "vacancy_index_2*.csv", exclude_substr="processed")
+    if latest_file is None:
         raise FileNotFoundError("No raw vacancy index files found in data directory")
-    return max(raw_files, key=lambda x: x.stat().st_mtime)
+    return latest_file
 
 def main():
     """Main function to process vacancy index data."""
@@ -39,19 +36,20 @@ def main():
         processor = VacancyIndexProcessor(input_file=input_file)
         output_path = processor.process()
         logger.info(f"Successfully processed data and saved to: {output_path}")
+        return 0
 
     except FileNotFoundError as e:
         logger.error(f"File not found: {e}")
-        sys.exit(1)
+        return 1
     except DataValidationError as e:
         logger.error(f"Data validation error: {e}")
-        sys.exit(1)
+        return 1
     except ProcessingError as e:
         logger.error(f"Processing error: {e}")
-        sys.exit(1)
+        return 1
     except Exception as e:
         logger.error(f"Unexpected error occurred: {e}")
-        sys.exit(1)
+        return 1
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main()) 
\ No newline at end of file
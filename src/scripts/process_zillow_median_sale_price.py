@@ -12,18 +12,16 @@ from pathlib import Path
 from ..scrapers.zillow.median_sale_price_processor import MedianSalePriceProcessor
 from ..utils.exceptions import ProcessingError, DataValidationError
 from ..utils.logger import get_logger
+from ._latest import latest
 
 logger = get_logger(__name__)
 
 def find_latest_raw_file(data_dir: Path) -> Path:
     """Find the latest raw Zillow median sale price file."""
     # 只查找原始文件，不包含 "processed" 的文件
-    raw_files = [f for f in data_dir.glob("zillow_median_sale_price_2*.csv") 
-                if "processed" not in f.name]
-    
-    if not raw_files:
+    latest_file = latest(data_dir, "zillow_median_sale_price_2*.csv", exclude_substr="processed")
+    if latest_file is None:
         raise FileNotFoundError("No raw Zillow median sale price files found")
-    latest_file = max(raw_files, key=lambda p: p.stat().st_mtime)
     logger.debug(f"Found latest file: {latest_file}")
     return latest_file
 
@@ -6,27 +6,20 @@ from pathlib import Path
 
 from ..scrapers.zillow.renter_affordability_processor import RenterAffordabilityProcessor
 from ..utils.exceptions import ProcessingError, DataValidationError
+from ..utils.logger import configure_once
+from ._latest import latest
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+configure_once()
 
 logger = logging.getLogger(__name__)
 
 def find_latest_raw_file(data_dir: Path) -> Path:
     """Find the latest raw Zillow renter affordability file."""
     # 只查找原始文件，不包含 "processed" 的文件
-    raw_files = [f for f in data_dir.glob("zillow_renter_affordability_2*.csv") 
-                if "processed" not in f.name]
-    
-    if not raw_files:
+    latest_file = latest(data_dir, "zillow_renter_affordability_2*.csv", exclude_substr="processed")
+    if latest_file is None:
         raise FileNotFoundError("No raw Zillow renter affordability files found")
-    latest_file = max(raw_files, key=lambda p: p.stat().st_mtime)
     logger.debug(f"Found latest file: {latest_file}")
     return latest_file
 
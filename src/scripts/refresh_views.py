@@ -5,7 +5,7 @@ import sys
 from pathlib import Path
 
 from ..utils.config import Config
-from ..database import SupabaseClient
+from ..database import RentEstimatesClient
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,8 +17,8 @@ def main():
         # Load configuration
         config = Config.from_env()
         
-        # Initialize Supabase client
-        supabase = SupabaseClient(
+        # Initialize Supabase client (any table client gives access to the shared client)
+        supabase = RentEstimatesClient(
             url=config.supabase_url,
             key=config.supabase_service_role_key
         )
@@ -30,38 +30,40 @@ def main():
             'apartment_list_time_on_market_view'
         ]
         
-        # 刷新所有视图
+        # 刷新所有视图 (one raw_sql round-trip for all views)
         logger.info("开始刷新物化视图...")
+        refresh_sql = "\n".join(f"REFRESH MATERIALIZED VIEW {view_name};" for view_name in views)
+        try:
+            result = supabase.client.rpc('raw_sql', {'command': refresh_sql}).execute()
+        except Exception as e:
+            logger.error(f"刷新视图时发生错误: {str(e)}")
+            return 1
+        
+        if not (result.data and result.data.get('status') == 'success'):
+            logger.error(f"刷新视图失败: {result.data}")
+            return 1
+        
         for view_name in views:
             try:
-                refresh_sql = f"REFRESH MATERIALIZED VIEW {view_name};"
-                result = supabase.client.rpc('raw_sql', {'command': refresh_sql}).execute()
+                logger.info(f"成功刷新视图: {view_name}")
                 
-                if result.data and result.data.get('status') == 'success':
-                    logger.info(f"成功刷新视图: {view_name}")
-                    
-                    # 检查视图数据
-                    logger.info(f"检查视图 {view_name} 的数据...")
-                    response = supabase.client.from_(view_name).select('*').execute()
+                # 检查视图数据
+                logger.info(f"检查视图 {view_name} 的数据...")
+                # The distribution is grouped on the server (sql/create_location_type_counts_function.sql),
+                # so it covers every row and the total is its sum
+                response = supabase.client.rpc('location_type_counts', {'view_name': view_name}).execute()
+                
+                if response.data:
+                    logger.info(f"视图记录数: {sum(row['record_count'] for row in response.data)}")
                     
-                    if response.data:
-                        logger.info(f"视图记录数: {len(response.data)}")
-                        
-                        # 统计location_type分布
-                        type_counts = {}
-                        for record in response.data:
-                            location_type = record['location_type']
-                            type_counts[location_type] = type_counts.get(location_type, 0) + 1
-                            
-                        logger.info(f"\n{view_name} 数据分布:")
-                        for location_type, count in type_counts.items():
-                            logger.info(f"{location_type}: {count} 条记录")
-                    else:
-                        logger.warning(f"视图 {view_name} 中没有数据")
+                    # 统计location_type分布
+                    logger.info(f"\n{view_name} 数据分布:")
+                    for row in response.data:
+                        logger.info(f"{row['location_type']}: {row['record_count']} 条记录")
                 else:
-                    logger.error(f"刷新视图 {view_name} 失败: {result.data}")
+                    logger.warning(f"视图 {view_name} 中没有数据")
             except Exception as e:
-                logger.error(f"刷新视图 {view_name} 时发生错误: {str(e)}")
+                logger.error(f"检查视图 {view_name} 时发生错误: {str(e)}")
             
             logger.info("---")
         
@@ -1,12 +1,18 @@
 """Script to run full data pipeline test locally."""
 
 import logging
+import os
 import subprocess
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from datetime import datetime
 
+from ..utils.config import Config
+from ..utils.exceptions import ConfigurationError
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -23,6 +29,9 @@ def run_script(script_name: str) -> Tuple[bool, str]:
     """
     Run a Python script and return its status.
     
+    The script's output is streamed line by line to the log as it is produced
+    instead of being buffered in memory until the script exits.
+    
     Args:
         script_name: Name of the script to run
         
@@ -31,15 +40,23 @@ def run_script(script_name: str) -> Tuple[bool, str]:
     """
     try:
         logger.info(f"Running {script_name}...")
-        result = subprocess.run(
+        # Keep only the last lines of output for the error message
+        tail = deque(maxlen=20)
+        with subprocess.Popen(
             [sys.executable, '-m', f'src.scripts.{script_name}'],
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
-            check=True
-        )
-        return True, f"{script_name} completed successfully"
-    except subprocess.CalledProcessError as e:
-        error_msg = f"Error in {script_name}: {e.stderr}"
+            bufsize=1
+        ) as process:
+            for line in process.stdout:
+                line = line.rstrip()
+                logger.info("[%s] %s", script_name, line)
+                tail.append(line)
+            returncode = process.wait()
+        if returncode == 0:
+            return True, f"{script_name} completed successfully"
+        error_msg = f"Error in {script_name} (exit code {returncode}): " + "\n".join(tail)
         logger.error(error_msg)
         return False, error_msg
     except Exception as e:
@@ -47,59 +64,116 @@ def run_script(script_name: str) -> Tuple[bool, str]:
         logger.error(error_msg)
         return False, error_msg
 
+def run_script_in_process(script_name: str, config: Config) -> Tuple[bool, str]:
+    """
+    Run a pipeline script inside the current process and return its status.
+    
+    Args:
+        script_name: Name of the script to run
+        config: Configuration shared by all scripts of the run
+        
+    Returns:
+        Tuple[bool, str]: (success, message)
+    """
+    # Imported here so the --isolated mode does not load every script module
+    from .pipeline import run as run_pipeline
+    
+    logger.info(f"Running {script_name}...")
+    [(_, success)] = run_pipeline([script_name], config=config)
+    if success:
+        return True, f"{script_name} completed successfully"
+    error_msg = f"Error in {script_name}, see the log output above"
+    logger.error(error_msg)
+    return False, error_msg
+
+def run_chain(scripts: List[str], config: Optional[Config] = None) -> List[Tuple[str, bool, str]]:
+    """
+    Run one dataset's scripts in order (scrape -> process -> import).
+    
+    Args:
+        scripts: Names of the scripts to run
+        config: Configuration for in-process runs; None runs each script in a subprocess
+        
+    Returns:
+        List[Tuple[str, bool, str]]: (script, success, message) for each script
+    """
+    results = []
+    for script in scripts:
+        success, message = run_script(script) if config is None else run_script_in_process(script, config)
+        results.append((script, success, message))
+    return results
+
 def main():
-    """Main entry point for running full test."""
+    """
+    Main entry point for running full test.
+    
+    The datasets are independent, so each dataset's chain of scripts runs in
+    its own worker process. Within a worker, scripts run in-process sharing one
+    configuration; pass --isolated to run each one in its own subprocess instead.
+    """
+    isolated = '--isolated' in sys.argv[1:]
     # 确保必要的目录存在
     Path('data/raw').mkdir(parents=True, exist_ok=True)
     Path('data/processed').mkdir(parents=True, exist_ok=True)
     Path('logs').mkdir(exist_ok=True)
     
-    # 定义要执行的脚本列表
-    scripts = [
+    # Script chains: run in order within a dataset, datasets are independent
+    chains = [
         # ApartmentList Rent Estimates
-        'scrape_apartment_list_rent_estimates',
-        'process_apartment_list_rent_estimates',
-        'import_apartment_list_rent_estimates',
+        ['scrape_apartment_list_rent_estimates',
+         'process_apartment_list_rent_estimates',
+         'import_apartment_list_rent_estimates'],
         
         # ApartmentList Vacancy Index
-        'scrape_apartment_list_vacancy_index',
-        'process_apartment_list_vacancy_index',
-        'import_apartment_list_vacancy_index',
+        ['scrape_apartment_list_vacancy_index',
+         'process_apartment_list_vacancy_index',
+         'import_apartment_list_vacancy_index'],
         
         # ApartmentList Time on Market
-        'scrape_apartment_list_time_on_market',
-        'process_apartment_list_time_on_market',
-        'import_apartment_list_time_on_market',
+        ['scrape_apartment_list_time_on_market',
+         'process_apartment_list_time_on_market',
+         'import_apartment_list_time_on_market'],
         
         # Zillow Homeowner Affordability
-        'scrape_zillow_affordability',
-        'process_zillow_affordability',
-        'import_zillow_affordability',
+        ['scrape_zillow_affordability',
+         'process_zillow_affordability',
+         'import_zillow_affordability'],
         
         # Zillow Renter Affordability
-        'scrape_zillow_renter_affordability',
-        'process_zillow_renter_affordability',
-        'import_zillow_renter_affordability'
+        ['scrape_zillow_renter_affordability',
+         'process_zillow_renter_affordability',
+         'import_zillow_renter_affordability']
     ]
     
     # 执行所有脚本
     results = []
-    total_scripts = len(scripts)
+    total_scripts = sum(len(chain) for chain in chains)
     failed_scripts = []
     
+    config = None
+    if not isolated:
+        try:
+            config = Config.from_env()
+        except ConfigurationError as e:
+            logger.error(f"Configuration error: {e}")
+            return 1
+    
     logger.info(f"Starting full test with {total_scripts} scripts")
     print(f"\n{'='*80}\nStarting full test with {total_scripts} scripts\n{'='*80}\n")
     
-    for i, script in enumerate(scripts, 1):
-        print(f"\n[{i}/{total_scripts}] Running {script}...")
-        success, message = run_script(script)
-        results.append((script, success, message))
-        
-        if not success:
-            failed_scripts.append(script)
-            print(f"❌ {script} failed: {message}")
-        else:
-            print(f"✅ {script} completed successfully")
+    max_workers = min(len(chains), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_chain, chain, config) for chain in chains]
+        for future in as_completed(futures):
+            for script, success, message in future.result():
+                results.append((script, success, message))
+                print(f"\n[{len(results)}/{total_scripts}] {script}")
+                
+                if not success:
+                    failed_scripts.append(script)
+                    print(f"❌ {script} failed: {message}")
+                else:
+                    print(f"✅ {script} completed successfully")
     
     # 打印总结报告
     print(f"\n{'='*80}\nTest Summary\n{'='*80}")
@@ -117,4 +191,4 @@ def main():
         return 0
 
 if __name__ == '__main__':
-    sys.exit(main()) 
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -1,24 +1,25 @@
 """Script to schedule data updates."""
 
+import importlib.util
 import logging
 import sys
-import subprocess
-import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
 
+from apscheduler.executors.pool import ThreadPoolExecutor as APSThreadPoolExecutor
 from apscheduler.schedulers.background import BackgroundScheduler
-from flask import Flask, jsonify
+from flask import Flask, Response, abort, jsonify
 
 from ..utils.config import Config
-from ..database import (
-    RentEstimatesClient,
-    VacancyIndexClient,
-    TimeOnMarketClient,
-    HomeownerAffordabilityClient,
-    RenterAffordabilityClient,
-    MedianSalePriceClient
-)
+from ..utils.exceptions import ConfigurationError
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,154 +29,467 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 
 # 创建调度器
-scheduler = BackgroundScheduler()
+# Updates spend most of their time waiting on the network and the database, so
+# a thread pool is enough; only one update runs at a time and missed runs are
+# coalesced into one
+scheduler = BackgroundScheduler(
+    executors={'default': APSThreadPoolExecutor(max_workers=4)},
+    job_defaults={'max_instances': 1, 'coalesce': True, 'misfire_grace_time': 300}
+)
 
-def run_script(script_name: str) -> bool:
-    """运行指定的Python脚本。"""
-    try:
-        logger.info(f"开始执行脚本: {script_name}")
-        result = subprocess.run(
-            [sys.executable, "-m", f"src.scripts.{script_name}"],
-            check=True,
-            capture_output=True,
-            text=True,
-            env=os.environ.copy()  # 确保环境变量被正确传递
+# Script chains: run in order within a dataset, datasets are independent
+SCRIPT_CHAINS = [
+    ['scrape_apartment_list_rent_estimates',
+     'process_apartment_list_rent_estimates',
+     'import_apartment_list_rent_estimates'],
+    ['scrape_apartment_list_vacancy_index',
+     'process_apartment_list_vacancy_index',
+     'import_apartment_list_vacancy_index'],
+    ['scrape_apartment_list_time_on_market',
+     'process_apartment_list_time_on_market',
+     'import_apartment_list_time_on_market'],
+    ['scrape_zillow_affordability',
+     'process_zillow_affordability',
+     'import_zillow_affordability'],
+    ['scrape_zillow_renter_affordability',
+     'process_zillow_renter_affordability',
+     'import_zillow_renter_affordability'],
+    ['scrape_zillow_median_sale_price',
+     'process_zillow_median_sale_price',
+     'import_zillow_median_sale_price']
+]
+
+def validate_scripts() -> None:
+    """
+    Check that every scheduled script module exists.
+    
+    Only the module specs are looked up (nothing is imported), so a mistyped
+    script name fails when the scheduler starts instead of at the next run.
+    
+    Raises:
+        ConfigurationError: If a script module cannot be found
+    """
+    missing_scripts = [
+        script for chain in SCRIPT_CHAINS for script in chain
+        if importlib.util.find_spec(f"{__package__}.{script}") is None
+    ]
+    if missing_scripts:
+        raise ConfigurationError(f"Scheduled scripts not found: {missing_scripts}")
+
+validate_scripts()
+
+@lru_cache(maxsize=None)
+def get_config() -> Config:
+    """Load the configuration once for the lifetime of the scheduler process."""
+    return Config.from_env()
+
+@lru_cache(maxsize=None)
+def get_view_clients() -> tuple:
+    """
+    Build the table clients whose views are refreshed, once per process.
+    
+    The clients share one Supabase client (and its keep-alive connections)
+    and, when database credentials are configured, one direct Postgres
+    connection, so later updates reuse them instead of setting up new ones
+    every run.
+    
+    The database package (supabase, psycopg) is imported here rather than at
+    module level, so the web process only loads it once views are refreshed.
+    """
+    from ..database import (
+        RentEstimatesClient,
+        VacancyIndexClient,
+        TimeOnMarketClient,
+        HomeownerAffordabilityClient,
+        RenterAffordabilityClient,
+        MedianSalePriceClient
+    )
+    
+    config = get_config()
+    client_classes = [
+        RentEstimatesClient,
+        VacancyIndexClient,
+        TimeOnMarketClient,
+        HomeownerAffordabilityClient,
+        RenterAffordabilityClient,
+        MedianSalePriceClient
+    ]
+    return tuple(
+        client_class(
+            url=config.supabase_url,
+            key=config.supabase_service_role_key,
+            db_dsn=config.database_dsn
         )
-        logger.info(f"脚本 {script_name} 执行完成")
-        if result.stdout:
-            logger.info(f"脚本输出: {result.stdout}")
-        return True
-    except subprocess.CalledProcessError as e:
-        logger.error(f"脚本 {script_name} 执行失败")
-        if e.stdout:
-            logger.error(f"标准输出: {e.stdout}")
-        if e.stderr:
-            logger.error(f"错误输出: {e.stderr}")
-        return False
-    except Exception as e:
-        logger.error(f"执行脚本 {script_name} 时发生未知错误: {str(e)}")
-        return False
+        for client_class in client_classes
+    )
 
-def update_database_views(config: Config):
+@lru_cache(maxsize=None)
+def get_import_clients() -> Dict[str, object]:
+    """
+    Map each import script to its table client, built once per process.
+    
+    The view clients are the same table clients, so imports and view
+    refreshes share them (and their connections). Without the service role
+    key no clients are built, and the import scripts report the error.
+    """
+    from .pipeline import IMPORT_CLIENTS
+    
+    if not get_config().supabase_service_role_key:
+        return {}
+    clients_by_class = {type(client): client for client in get_view_clients()}
+    return {
+        job: clients_by_class[client_class]
+        for job, client_class in IMPORT_CLIENTS.items()
+        if client_class in clients_by_class
+    }
+
+def update_database_views():
     """Update database views."""
     try:
-        # Initialize clients
-        clients = [
-            RentEstimatesClient(url=config.supabase_url, key=config.supabase_service_role_key),
-            VacancyIndexClient(url=config.supabase_url, key=config.supabase_service_role_key),
-            TimeOnMarketClient(url=config.supabase_url, key=config.supabase_service_role_key),
-            HomeownerAffordabilityClient(url=config.supabase_url, key=config.supabase_service_role_key),
-            RenterAffordabilityClient(url=config.supabase_url, key=config.supabase_service_role_key),
-            MedianSalePriceClient(url=config.supabase_url, key=config.supabase_service_role_key)
-        ]
+        # Reuse the process-wide clients
+        clients = get_view_clients()
+        view_names = [client.VIEW_NAME for client in clients]
         
-        results = []
-        for client in clients:
-            try:
-                client.refresh_materialized_view(client.VIEW_NAME)
-                logger.info(f"已刷新视图: {client.VIEW_NAME}")
-                results.append({'status': 'success', 'view': client.VIEW_NAME})
-            except Exception as e:
-                error_msg = f"刷新视图 {client.VIEW_NAME} 时发生错误: {str(e)}"
-                logger.error(error_msg)
-                results.append({'status': 'error', 'view': client.VIEW_NAME, 'error': error_msg})
+        # Refresh the views whose base tables changed; only if that fails,
+        # refresh every view separately to find out which views failed
+        try:
+            refreshed = set(clients[0].refresh_changed_materialized_views(view_names))
+            logger.info(f"已刷新有变化的视图: {', '.join(sorted(refreshed)) or '无'}")
+            return [
+                {'status': 'success' if view_name in refreshed else 'unchanged', 'view': view_name}
+                for view_name in view_names
+            ]
+        except Exception as e:
+            logger.warning(f"批量刷新视图失败, 逐个刷新: {str(e)}")
+        
+        # The views are independent, so they are refreshed in parallel
+        results = {}
+        with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+            futures = {
+                executor.submit(client.refresh_materialized_view, client.VIEW_NAME, concurrently=True): client.VIEW_NAME
+                for client in clients
+            }
+            for future in as_completed(futures):
+                view_name = futures[future]
+                try:
+                    future.result()
+                    logger.info(f"已刷新视图: {view_name}")
+                    results[view_name] = {'status': 'success', 'view': view_name}
+                except Exception as e:
+                    error_msg = f"刷新视图 {view_name} 时发生错误: {str(e)}"
+                    logger.error(error_msg)
+                    results[view_name] = {'status': 'error', 'view': view_name, 'error': error_msg}
                 
-        return results
+        return [results[view_name] for view_name in view_names]
                 
     except Exception as e:
         error_msg = f"更新视图时发生错误: {e}"
         logger.error(error_msg)
         return [{'status': 'error', 'error': error_msg}]
 
-def run_full_update() -> list:
-    """运行完整的数据更新流程。"""
-    results = []
+def run_script(script_name: str) -> Tuple[bool, float, Optional[str]]:
+    """
+    运行指定的Python脚本。
     
-    # 运行所有数据处理脚本
-    scripts = [
-        'scrape_apartment_list_rent_estimates',
-        'process_apartment_list_rent_estimates',
-        'import_apartment_list_rent_estimates',
-        'scrape_apartment_list_vacancy_index',
-        'process_apartment_list_vacancy_index',
-        'import_apartment_list_vacancy_index',
-        'scrape_apartment_list_time_on_market',
-        'process_apartment_list_time_on_market',
-        'import_apartment_list_time_on_market',
-        'scrape_zillow_affordability',
-        'process_zillow_affordability',
-        'import_zillow_affordability',
-        'scrape_zillow_renter_affordability',
-        'process_zillow_renter_affordability',
-        'import_zillow_renter_affordability',
-        'scrape_zillow_median_sale_price',
-        'process_zillow_median_sale_price',
-        'import_zillow_median_sale_price'
-    ]
+    The script's main() is called in this process through the pipeline
+    runner, so interpreter start-up and imports (pandas, supabase) are paid
+    once per process instead of once per script; the configuration is the
+    process-wide one from get_config(), and import scripts reuse the
+    process-wide clients from get_import_clients().
+    
+    Returns:
+        Tuple[bool, float, Optional[str]]: Whether the script succeeded, how long
+        it ran in seconds, and the error if it raised one (other failures are
+        logged by the script itself)
+    """
+    # Imported lazily: the pipeline imports every script module
+    from . import pipeline
     
+    start = time.perf_counter()
+    try:
+        logger.info(f"开始执行脚本: {script_name}")
+        [(_, success)] = pipeline.run([script_name], config=get_config(), clients=get_import_clients())
+        if success:
+            logger.info(f"脚本 {script_name} 执行完成")
+        else:
+            logger.error(f"脚本 {script_name} 执行失败")
+        return success, time.perf_counter() - start, None
+    except Exception as e:
+        logger.error(f"执行脚本 {script_name} 时发生未知错误: {str(e)}")
+        return False, time.perf_counter() - start, str(e)
+
+# Processing scripts are CPU-bound (pandas) and run in this process, so they
+# share one GIL with each other and with the Flask worker serving /health;
+# running more than one at a time would not add throughput, only contention,
+# so one runs at a time. Scrape and import scripts wait on the network, with
+# at most MAX_CONCURRENT_SCRAPES scrapes at a time
+MAX_CONCURRENT_PROCESSING = 1
+_process_slots = threading.BoundedSemaphore(MAX_CONCURRENT_PROCESSING)
+MAX_CONCURRENT_SCRAPES = 3
+_scrape_slots = threading.BoundedSemaphore(MAX_CONCURRENT_SCRAPES)
+
+def run_chain(scripts: List[str]) -> list:
+    """
+    Run one dataset's scripts in order (scrape -> process -> import).
+    
+    Processing scripts wait for the processing slot and scrapes for a scrape
+    slot, so one chain's processing overlaps the others' network waits. A failed script stops the
+    chain, since the later scripts depend on its output.
+    
+    Args:
+        scripts: Names of the scripts to run
+        
+    Returns:
+        list: Status, duration and (on failure) error of each script that ran
+    """
+    results = []
     for script in scripts:
-        success = run_script(script)
-        results.append({
+        if script.startswith('process_'):
+            with _process_slots:
+                success, duration, error = run_script(script)
+        elif script.startswith('scrape_'):
+            with _scrape_slots:
+                success, duration, error = run_script(script)
+        else:
+            success, duration, error = run_script(script)
+        result = {
             'script': script,
-            'status': 'success' if success else 'error'
-        })
+            'status': 'success' if success else 'error',
+            'duration_seconds': round(duration, 2)
+        }
+        results.append(result)
+        if not success:
+            result['error'] = error
+            break
+    return results
+
+def run_full_update() -> list:
+    """
+    运行完整的数据更新流程。
+    
+    The datasets do not depend on each other, so each dataset's chain of
+    scripts runs in its own thread and the chains run in parallel (see
+    run_chain). Views are refreshed once, after all chains have finished.
+    """
+    results = []
     
-    # 加载配置
-    config = Config.from_env()
+    # 运行所有数据处理脚本
+    with ThreadPoolExecutor(max_workers=len(SCRIPT_CHAINS)) as executor:
+        for chain_results in executor.map(run_chain, SCRIPT_CHAINS):
+            results.extend(chain_results)
     
     # 刷新物化视图
     logger.info("开始刷新物化视图")
-    view_results = update_database_views(config)
+    view_results = update_database_views()
     results.extend(view_results)
     
     logger.info("完整数据更新流程完成")
     return results
 
-def run_daily_update():
-    """Run daily update tasks."""
+# Only one update runs at a time; a manual trigger within
+# MIN_UPDATE_INTERVAL_SECONDS of the start of the last update is not repeated
+# and that update's results are reused
+MIN_UPDATE_INTERVAL_SECONDS = 3500
+_update_lock = threading.Lock()
+_last_update: Optional[Tuple[float, list]] = None
+
+def get_recent_update() -> Optional[list]:
+    """Return the results of the last update if it started recently enough to reuse."""
+    last_update = _last_update
+    if last_update and time.time() - last_update[0] < MIN_UPDATE_INTERVAL_SECONDS:
+        return last_update[1]
+    return None
+
+def run_daily_update(reuse_recent: bool = False):
+    """
+    Run daily update tasks.
+    
+    Skipped while another update is running (the manual trigger and the
+    hourly job can overlap). The hourly job always runs; a manual trigger
+    (reuse_recent=True) is answered with the previous results if the last
+    update started less than MIN_UPDATE_INTERVAL_SECONDS ago.
+    
+    Args:
+        reuse_recent: Return the results of a recent update instead of running
+    """
+    global _last_update
+    if not _update_lock.acquire(blocking=False):
+        logger.info("已有更新正在运行, 跳过本次更新")
+        return {'status': 'skipped', 'reason': 'update already running'}
     try:
-        return run_full_update()
+        if reuse_recent:
+            recent_results = get_recent_update()
+            if recent_results is not None:
+                logger.info("最近已完成更新, 跳过本次更新")
+                return recent_results
+        started = time.time()
+        results = run_full_update()
+        _last_update = (started, results)
+        return results
     except Exception as e:
         error_msg = f"每日更新失败: {e}"
         logger.error(error_msg)
         return {'status': 'error', 'error': error_msg}
+    finally:
+        _update_lock.release()
+
+# Results of manually triggered updates, keyed by job id, oldest first; only
+# the last MAX_JOB_RESULTS jobs are kept so the process does not grow forever
+MAX_JOB_RESULTS = 100
+job_results: 'OrderedDict[str, dict]' = OrderedDict()
+_job_results_lock = threading.Lock()
+
+def set_job_result(job_id: str, **fields) -> None:
+    """Merge fields into a job's stored result and evict the oldest jobs beyond MAX_JOB_RESULTS."""
+    with _job_results_lock:
+        job_results.setdefault(job_id, {}).update(fields)
+        job_results.move_to_end(job_id)
+        while len(job_results) > MAX_JOB_RESULTS:
+            job_results.popitem(last=False)
+
+def run_manual_update(job_id: str) -> None:
+    """Run a manually triggered update and store its results under job_id."""
+    set_job_result(job_id, status='running', started=datetime.now().isoformat())
+    results = run_daily_update(reuse_recent=True)
+    set_job_result(job_id, status='finished', results=results, finished=datetime.now().isoformat())
+
+# Request threads may call init_scheduler() concurrently
+_scheduler_lock = threading.Lock()
+
+# Held by the one process on the host that runs the hourly update
+SCHEDULER_LOCK_FILE = Path(tempfile.gettempdir()) / 'real_analytics_db_scheduler.lock'
+_scheduler_lock_file = None
+_runs_hourly_update = False
+
+def acquire_update_lock() -> bool:
+    """
+    Try to become the process that runs the hourly update.
+    
+    Takes a non-blocking exclusive lock on SCHEDULER_LOCK_FILE and keeps it
+    for the lifetime of the process, so when several web workers run only
+    one of them schedules the update; if that worker dies the lock is
+    released and another worker takes over on its next init_scheduler().
+    
+    Returns:
+        bool: True if this process holds the lock
+    """
+    global _scheduler_lock_file
+    try:
+        import fcntl
+    except ImportError:
+        # No flock (Windows): assume a single process
+        return True
+    
+    lock_file = open(SCHEDULER_LOCK_FILE, 'a')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _scheduler_lock_file = lock_file
+    return True
 
 def init_scheduler():
-    """Initialize the scheduler."""
-    if not scheduler.running:
-        scheduler.add_job(run_daily_update, 'interval', hours=1)
-        scheduler.start()
-        logger.info("调度器已启动")
+    """
+    Initialize the scheduler.
+    
+    Every process starts the scheduler so manually triggered updates can run,
+    but only the process holding the update lock adds the hourly update job.
+    Views are refreshed at the end of each update (see run_full_update).
+    """
+    global _runs_hourly_update
+    with _scheduler_lock:
+        if not _runs_hourly_update and acquire_update_lock():
+            _runs_hourly_update = True
+            scheduler.add_job(run_daily_update, 'interval', hours=1, id='hourly-update')
+            logger.info("本进程负责每小时更新")
+        if not scheduler.running:
+            scheduler.start()
+            logger.info("调度器已启动")
+
+# Static parts of the health response, so a probe only formats the time
+_HEALTH_PREFIX = b'{"status":"running","time":"'
+_HEALTH_SUFFIXES = {
+    True: b'","scheduler_status":"running"}',
+    False: b'","scheduler_status":"not running"}'
+}
 
 @app.route('/')
+@app.route('/health')
 def home():
-    """Home page."""
+    """Home page and health check."""
     # 确保调度器已启动
-    init_scheduler()
+    if not scheduler.running:
+        init_scheduler()
     
-    return jsonify({
-        'status': 'running',
-        'time': datetime.now().isoformat(),
-        'scheduler_status': 'running' if scheduler.running else 'not running'
-    })
+    return Response(
+        _HEALTH_PREFIX + datetime.now().isoformat().encode() + _HEALTH_SUFFIXES[scheduler.running],
+        mimetype='application/json'
+    )
 
 @app.route('/run-update')
 def trigger_update():
-    """Manually trigger update."""
+    """
+    Manually trigger update.
+    
+    The update is queued on the scheduler's executor and runs in the
+    background; poll /jobs/<job_id> for its results. While an update is
+    running nothing is queued, and the results of a recent update are
+    returned directly.
+    """
     logger.info("手动触发完整数据更新流程")
-    results = run_full_update()
+    init_scheduler()
+    
+    if _update_lock.locked():
+        return jsonify({
+            'status': 'already running',
+            'time': datetime.now().isoformat()
+        }), 409
+    recent_results = get_recent_update()
+    if recent_results is not None:
+        return jsonify({
+            'status': 'recently updated',
+            'results': recent_results,
+            'time': datetime.now().isoformat()
+        })
+    
+    job_id = f"manual-{uuid4()}"
+    set_job_result(job_id, status='scheduled')
+    scheduler.add_job(
+        run_manual_update,
+        args=[job_id],
+        id=job_id,
+        replace_existing=False,
+        misfire_grace_time=3600
+    )
     return jsonify({
-        'status': 'update triggered',
-        'results': results,
+        'status': 'scheduled',
+        'job_id': job_id,
         'time': datetime.now().isoformat()
-    })
+    }), 202
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id: str):
+    """Return the status and results of a manually triggered update."""
+    with _job_results_lock:
+        result = job_results.get(job_id)
+        if result is None:
+            abort(404)
+        return jsonify({'job_id': job_id, **result})
 
 def main():
-    """Main entry point."""
+    """
+    Main entry point for local runs.
+    
+    In production the app is served by gunicorn (see gunicorn.conf.py);
+    Flask's development server is only used here.
+    """
     try:
+        init_scheduler()
+        
         # Run Flask app
         port = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
-        app.run(host='0.0.0.0', port=port)
+        app.run(host='0.0.0.0', port=port, threaded=True)
         
     except (KeyboardInterrupt, SystemExit):
         if scheduler.running:
@@ -3,27 +3,23 @@
 import logging
 import sys
 from pathlib import Path
+from typing import Optional
 
 from ..scrapers.apartment_list.time_on_market_scraper import TimeOnMarketScraper
 from ..utils.config import Config
 from ..utils.exceptions import ConfigurationError, DataValidationError, ScrapingError
+from ..utils.logger import configure_once
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+configure_once()
 
 logger = logging.getLogger(__name__)
 
-def main():
+def main(config: Optional[Config] = None):
     """Main entry point for the ApartmentList time on market scraping script."""
     try:
         # Load configuration
-        config = Config.from_env()
+        config = config or Config.from_env()
         
         # Initialize and run scraper
         scraper = TimeOnMarketScraper(config)
@@ -8,6 +8,7 @@ median sale price data from Zillow.
 import logging
 import sys
 from pathlib import Path
+from typing import Optional
 
 from ..scrapers.zillow.median_sale_price_scraper import MedianSalePriceScraper
 from ..utils.config import Config
@@ -16,11 +17,11 @@ from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-def main():
+def main(config: Optional[Config] = None):
     """主函数"""
     try:
         # 加载配置
-        config = Config.from_env()
+        config = config or Config.from_env()
         
         # 创建下载器
         scraper = MedianSalePriceScraper(config)
@@ -0,0 +1,182 @@
+"""Helpers for sizing batched database imports."""
+
+import json
+import logging
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+from tqdm import tqdm
+
+from .exceptions import DataImportError
+
+logger = logging.getLogger(__name__)
+
+# Supabase rejects request bodies above ~1MB; keep some headroom for SQL overhead
+MAX_PAYLOAD_BYTES = 900_000
+
+def fit_batch_size(records: List[Dict[str, Any]], batch_size: int,
+                   max_payload_bytes: int = MAX_PAYLOAD_BYTES, sample_size: int = 100) -> int:
+    """
+    Shrink a batch size so that a batch stays under the request payload limit.
+
+    Args:
+        records: Records to be imported
+        batch_size: Requested number of records per batch
+        max_payload_bytes: Maximum estimated payload size per batch
+        sample_size: Number of leading records used to estimate record size
+
+    Returns:
+        int: Batch size to use (never larger than the requested one)
+    """
+    sample = records[:sample_size]
+    if not sample:
+        return batch_size
+
+    avg_record_bytes = sum(len(json.dumps(record, default=str)) for record in sample) / len(sample)
+    max_rows = max(1, int(max_payload_bytes // avg_record_bytes))
+
+    if max_rows < batch_size:
+        logger.info(f"Reducing batch size from {batch_size} to {max_rows} "
+                    f"(~{avg_record_bytes:.0f} bytes per record)")
+        return max_rows
+    return batch_size
+
+
+def to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Convert a DataFrame to records with NaN, NA and 'nan' strings mapped to None.
+
+    Equivalent to df.replace({nan: None, 'nan': None}).to_dict('records'), but
+    works on one object array per column instead of copying the frame and
+    boxing every value through pandas. Numeric columns, including pandas'
+    nullable Int/Float dtypes, are checked for missing values on their native
+    dtype and skip the 'nan' string comparison.
+
+    Args:
+        df: DataFrame to convert
+
+    Returns:
+        List[Dict[str, Any]]: One dict per row with native Python values
+    """
+    columns = df.columns.tolist()
+    data = []
+    for col in columns:
+        series = df[col]
+        values = series.to_numpy(dtype=object)
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            # Numeric (including nullable) columns: detect NA on the native dtype, no string scan
+            missing = series.isna().to_numpy()
+        else:
+            missing = pd.isna(values) | (values == 'nan')
+        if missing.any():
+            values[missing] = None
+        data.append(values)
+
+    # Local aliases keep the per-row lookups out of the global namespace
+    _dict, _zip = dict, zip
+    return [_dict(_zip(columns, row)) for row in _zip(*data)]
+
+
+def import_in_batches(records: List[Dict[str, Any]], insert_batch: Callable[[List[Dict[str, Any]]], int],
+                      batch_size: int, concurrency: int = 1, max_retries: int = 3,
+                      base_retry_delay: float = 0.5, max_retry_delay: float = 30) -> int:
+    """
+    Import records in batches, optionally with several batches in flight at once.
+
+    Args:
+        records: Records to import
+        insert_batch: Callable that inserts one batch and returns the number of records imported
+        batch_size: Number of records per batch
+        concurrency: Maximum number of batches uploaded concurrently
+        max_retries: Maximum attempts per batch
+        base_retry_delay: Base delay in seconds for exponential backoff
+        max_retry_delay: Upper bound in seconds for a single retry delay
+
+    Returns:
+        int: Total number of records imported
+
+    Raises:
+        DataImportError: If a batch still fails after all retries
+    """
+    batches = (records[start_idx:start_idx + batch_size] for start_idx in range(0, len(records), batch_size))
+    return import_batches(batches, insert_batch, concurrency=concurrency, max_retries=max_retries,
+                          base_retry_delay=base_retry_delay, max_retry_delay=max_retry_delay,
+                          total=len(records))
+
+
+def import_batches(batches: Iterable[List[Dict[str, Any]]], insert_batch: Callable[[List[Dict[str, Any]]], int],
+                   concurrency: int = 1, max_retries: int = 3, base_retry_delay: float = 0.5,
+                   max_retry_delay: float = 30, total: Optional[int] = None) -> int:
+    """
+    Import batches produced lazily, keeping at most `concurrency` batches in flight.
+
+    Batches are pulled from the iterable only when a worker is free, so a
+    streaming source (e.g. a chunked CSV reader) is never fully materialized.
+
+    Args:
+        batches: Iterable of record batches
+        insert_batch: Callable that inserts one batch and returns the number of records imported
+        concurrency: Maximum number of batches uploaded concurrently
+        max_retries: Maximum attempts per batch
+        base_retry_delay: Base delay in seconds for exponential backoff
+        max_retry_delay: Upper bound in seconds for a single retry delay
+        total: Total number of records, if known, for the progress bar
+
+    Returns:
+        int: Total number of records imported
+
+    Raises:
+        DataImportError: If a batch still fails after all retries
+    """
+    concurrency = max(1, concurrency)
+
+    def insert_with_retry(batch_number: int, batch: List[Dict[str, Any]]) -> int:
+        for retry in range(max_retries):
+            try:
+                logger.debug("Attempting batch %d (Attempt %d/%d)", batch_number, retry + 1, max_retries)
+                return insert_batch(batch)
+            except Exception as e:
+                if retry < max_retries - 1:
+                    # Exponential backoff with jitter so concurrent clients do not retry in lockstep
+                    retry_delay = min(max_retry_delay, base_retry_delay * (2 ** retry) + random.uniform(0, base_retry_delay))
+                    logger.warning(f"Error importing batch {batch_number} "
+                                   f"(Attempt {retry + 1}/{max_retries}): {str(e)}")
+                    logger.warning(f"Retrying in {retry_delay:.2f} seconds...")
+                    time.sleep(retry_delay)
+                else:
+                    logger.error(f"Error importing batch {batch_number}: {str(e)}")
+                    logger.error(f"First record in failed batch: {batch[0] if batch else 'No records'}")
+                    raise DataImportError(f"Failed to import batch after {max_retries} attempts: {str(e)}") from e
+
+    total_imported = 0
+    pending = {}
+    with tqdm(total=total, desc="Importing data", mininterval=0.5) as pbar, \
+            ThreadPoolExecutor(max_workers=concurrency) as executor:
+
+        def collect(done) -> None:
+            nonlocal total_imported
+            for future in done:
+                batch_number, batch_rows = pending.pop(future)
+                rows_imported = future.result()
+                total_imported += rows_imported
+                # Advance by the batch length; the server-reported count may be 0 on success
+                pbar.update(batch_rows)
+                logger.debug("Imported batch %d, imported %d records", batch_number, rows_imported)
+
+        try:
+            for batch_number, batch in enumerate(batches, start=1):
+                if len(pending) >= concurrency:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending[executor.submit(insert_with_retry, batch_number, batch)] = (batch_number, len(batch))
+            collect(as_completed(list(pending)))
+        except Exception:
+            # Do not start batches that are still queued once one has failed
+            for future in pending:
+                future.cancel()
+            raise
+
+    return total_imported
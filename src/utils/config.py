@@ -3,15 +3,28 @@
 import os
 import re
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
-from urllib.parse import urlparse
 
 from dotenv import load_dotenv
 
 from .exceptions import ConfigurationError
 
-@dataclass
+# Supabase project URL; same rule as the former startswith('https://') and
+# endswith('.supabase.co') check, for host names (any number of labels)
+_SUPABASE_URL_RE = re.compile(r'https://[A-Za-z0-9.-]+\.supabase\.co')
+
+def persist_processed_csv() -> bool:
+    """
+    Whether processors also write a CSV copy of their output.
+    
+    Importers read the Parquet output, so the CSV is only a debugging aid and
+    is written when PERSIST_PROCESSED_CSV=1.
+    """
+    return os.getenv("PERSIST_PROCESSED_CSV") == "1"
+
+@dataclass(frozen=True, slots=True)
 class Config:
     """Application configuration."""
     
@@ -42,6 +55,10 @@ class Config:
     # Logging
     log_level: str
     
+    # Import configuration
+    import_batch_size: int = 5000
+    import_concurrency: int = 4
+    
     # Time On Market Data Validation
     min_time_on_market_rows: int = 100
     min_time_on_market_base_columns: int = 7  # 基本列：location_name, location_type, location_fips_code, population, state, county, metro
@@ -53,6 +70,23 @@ class Config:
     apartment_list_api_key: Optional[str] = None
     supabase_service_role_key: Optional[str] = None
     
+    # Direct Postgres connection for COPY loads, opted into with DATABASE_URL
+    database_url: Optional[str] = None
+    
+    @property
+    def database_dsn(self) -> Optional[str]:
+        """
+        Direct Postgres connection string from DATABASE_URL.
+        
+        The DB_* settings are not used here: the .env template fills them
+        with placeholders, so the direct connection is only enabled when
+        DATABASE_URL is set explicitly.
+        
+        Returns:
+            Optional[str]: Connection URL, or None if DATABASE_URL is not set
+        """
+        return self.database_url or None
+    
     @staticmethod
     def _validate_supabase_url(url: str) -> str:
         """
@@ -67,22 +101,23 @@ class Config:
         Raises:
             ConfigurationError: If URL is invalid
         """
-        try:
-            # Basic validation
-            if not url.startswith('https://') or not url.endswith('.supabase.co'):
-                raise ValueError("URL must be in format: https://<project>.supabase.co")
-                
-            # Remove trailing slash if present
-            return url.rstrip('/')
+        if not _SUPABASE_URL_RE.fullmatch(url):
+            raise ConfigurationError(
+                "Invalid Supabase URL: URL must be in format: https://<project>.supabase.co"
+            )
             
-        except Exception as e:
-            raise ConfigurationError(f"Invalid Supabase URL: {str(e)}") from e
+        # Remove trailing slash if present
+        return url.rstrip('/')
     
     @classmethod
     def from_env(cls, env_file: Optional[str] = None) -> 'Config':
         """
         Create configuration from environment variables.
         
+        The result is cached per env_file, so the .env file is parsed and the
+        data/log directories are created once per process; use
+        Config.reload() to pick up a changed environment.
+        
         Args:
             env_file: Optional path to .env file
             
@@ -92,6 +127,17 @@ class Config:
         Raises:
             ConfigurationError: If required configuration is missing
         """
+        return cls._from_env(env_file)
+    
+    @classmethod
+    @lru_cache(maxsize=4)
+    def _from_env(cls, env_file: Optional[str]) -> 'Config':
+        """
+        Build the configuration for from_env.
+        
+        env_file is always passed positionally, so from_env() and
+        from_env(None) share one cache entry.
+        """
         # 强制重新加载环境变量
         load_dotenv(override=True)
         
@@ -153,10 +199,29 @@ class Config:
                 # Logging
                 log_level=os.getenv("LOG_LEVEL", "INFO"),
                 
+                # Import configuration
+                import_batch_size=int(os.getenv("IMPORT_BATCH_SIZE", "5000")),
+                import_concurrency=int(os.getenv("MAX_CONCURRENT_REQUESTS", "4")),
+                
                 # Optional configurations
                 apartment_list_api_key=os.getenv("APARTMENT_LIST_API_KEY"),
                 supabase_service_role_key=supabase_service_role_key,
+                database_url=os.getenv("DATABASE_URL"),
             )
             
         except (ValueError, TypeError) as e:
-            raise ConfigurationError(f"Invalid configuration: {str(e)}") from e 
\ No newline at end of file
+            raise ConfigurationError(f"Invalid configuration: {str(e)}") from e
+    
+    @classmethod
+    def reload(cls, env_file: Optional[str] = None) -> 'Config':
+        """
+        Drop the cached configurations and read the environment again.
+        
+        Args:
+            env_file: Optional path to .env file
+            
+        Returns:
+            Config: Freshly loaded configuration instance
+        """
+        cls._from_env.cache_clear()
+        return cls.from_env(env_file)
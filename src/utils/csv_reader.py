@@ -0,0 +1,98 @@
+"""Streaming readers for processed CSV and Parquet files backed by PyArrow."""
+
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+
+def read_csv_chunks(input_file: Path, chunk_size: int,
+                    column_types: Optional[Dict[str, pa.DataType]] = None,
+                    strings_can_be_null: bool = False) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV file in DataFrame chunks of `chunk_size` rows.
+
+    The file is parsed with PyArrow's multi-threaded streaming reader, so only
+    about one chunk is held in memory at a time.
+
+    Args:
+        input_file: CSV file to read
+        chunk_size: Number of rows per chunk (the last chunk may be smaller)
+        column_types: Explicit Arrow types per column; others are inferred from the
+            first block only, so callers should type every column
+        strings_can_be_null: Treat empty values in string columns as null
+
+    Yields:
+        pd.DataFrame: Next chunk of rows
+    """
+    convert_options = pacsv.ConvertOptions(
+        column_types=column_types or {},
+        strings_can_be_null=strings_can_be_null
+    )
+    reader = pacsv.open_csv(input_file, convert_options=convert_options)
+
+    pending = []
+    pending_rows = 0
+    for batch in reader:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+
+        # Arrow blocks are sized in bytes; re-slice them into fixed row counts
+        while pending_rows >= chunk_size:
+            table = pa.Table.from_batches(pending, schema=reader.schema)
+            yield table.slice(0, chunk_size).to_pandas()
+            rest = table.slice(chunk_size)
+            pending = rest.to_batches()
+            pending_rows = rest.num_rows
+
+    if pending_rows:
+        yield pa.Table.from_batches(pending, schema=reader.schema).to_pandas()
+
+
+def read_parquet_chunks(input_file: Path, chunk_size: int,
+                        column_types: Optional[Dict[str, pa.DataType]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a Parquet file in DataFrame chunks of at most `chunk_size` rows.
+
+    Args:
+        input_file: Parquet file to read
+        chunk_size: Maximum number of rows per chunk
+        column_types: Arrow types to cast columns to, matching the CSV reader
+
+    Yields:
+        pd.DataFrame: Next chunk of rows
+    """
+    parquet_file = pq.ParquetFile(input_file)
+    schema = parquet_file.schema_arrow
+    if column_types:
+        for name, column_type in column_types.items():
+            index = schema.get_field_index(name)
+            if index != -1:
+                schema = schema.set(index, pa.field(name, column_type))
+
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        yield pa.Table.from_batches([batch]).cast(schema).to_pandas()
+
+
+def read_chunks(input_file: Path, chunk_size: int,
+                column_types: Optional[Dict[str, pa.DataType]] = None,
+                strings_can_be_null: bool = False) -> Iterator[pd.DataFrame]:
+    """
+    Read a processed data file in chunks, choosing the reader by file suffix.
+
+    Args:
+        input_file: Parquet or CSV file to read
+        chunk_size: Number of rows per chunk
+        column_types: Explicit Arrow types for some columns
+        strings_can_be_null: Treat empty CSV values in string columns as null
+
+    Returns:
+        Iterator[pd.DataFrame]: Chunks of rows
+    """
+    if Path(input_file).suffix == '.parquet':
+        return read_parquet_chunks(input_file, chunk_size, column_types=column_types)
+    return read_csv_chunks(input_file, chunk_size, column_types=column_types,
+                           strings_can_be_null=strings_can_be_null)
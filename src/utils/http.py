@@ -0,0 +1,47 @@
+"""Shared HTTP sessions for the scrapers."""
+
+import threading
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connection pools kept per host, and connections kept per pool
+POOL_CONNECTIONS = 20
+POOL_MAXSIZE = 50
+
+# Bytes read per iteration when streaming a download to disk
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+_local = threading.local()
+
+@lru_cache(maxsize=None)
+def _get_adapter() -> HTTPAdapter:
+    """
+    Get the process-wide connection-pooling adapter.
+
+    Its urllib3 pool manager is thread-safe, so every thread's session mounts
+    this one adapter and keep-alive connections are reused across threads.
+    Retries stay with the scrapers' tenacity decorators, so the adapter does
+    not retry on its own.
+    """
+    return HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+
+def get_session() -> requests.Session:
+    """
+    Get the calling thread's requests session.
+
+    The scheduler runs several scrapers at once on different threads, and a
+    requests.Session (its cookie jar, for one) is not thread-safe, so each
+    thread gets its own session. The sessions share one pooled adapter (see
+    _get_adapter), so scrapers still reuse open TCP/TLS connections instead of
+    opening new ones. Headers are passed per request.
+    """
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        adapter = _get_adapter()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        _local.session = session
+    return session
@@ -1,5 +1,57 @@
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+from typing import Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# LOG_FORMAT uses no thread/process fields; skip filling them in on every LogRecord
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
+_configured = False
+
+def configure_once(level: Optional[int] = None) -> None:
+    """
+    Configure root logging for the pipeline scripts; later calls are no-ops.
+
+    At DEBUG level records are handed to a background thread through a queue,
+    so formatting and writing the high volume of debug output stays off the
+    import hot path.
+
+    Args:
+        level: Log level of the root logger; defaults to the LOG_LEVEL
+            environment variable (e.g. "DEBUG", "WARNING"), or INFO
+    """
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    if level is None:
+        level = logging.getLevelName(os.getenv("LOG_LEVEL", "INFO").upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    if level <= logging.DEBUG:
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(log_queue, console_handler)
+        listener.start()
+        atexit.register(listener.stop)
+        handler = logging.handlers.QueueHandler(log_queue)
+        # Only merge the message arguments here; the listener applies LOG_FORMAT
+        handler.setFormatter(logging.Formatter('%(message)s'))
+    else:
+        handler = console_handler
+
+    logging.basicConfig(level=level, handlers=[handler])
 
 def get_logger(name):
     """配置并返回一个日志记录器"""
@@ -14,7 +66,7 @@ def get_logger(name):
         console_handler.setLevel(logging.INFO)
         
         # 设置日志格式
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        formatter = logging.Formatter(LOG_FORMAT)
         console_handler.setFormatter(formatter)
         
         # 添加处理器到日志记录器
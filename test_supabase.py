@@ -2,31 +2,50 @@
 
 import os
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import pytest
-from dotenv import load_dotenv
 
 from src.utils.config import Config
-from src.database.supabase_client import SupabaseClient
+from src.database import RentEstimatesClient
 
-# Load environment variables
-load_dotenv()
+# 测试数据：模块级常量，只构建一次；insert_records 不修改传入的记录
+TEST_RECORDS: Tuple[Dict[str, Any], ...] = (
+    {
+        "location_name": "Test City 1",
+        "location_type": "City",
+        "location_fips_code": "12345",
+        "year_month": "2024_01",
+        "rent_estimate_overall": 1500.0,
+        "rent_estimate_1br": 1300.0,
+        "rent_estimate_2br": 1700.0
+    },
+    {
+        "location_name": "Test City 2",
+        "location_type": "City",
+        "location_fips_code": "67890",
+        "year_month": "2024_01",
+        "rent_estimate_overall": None,  # 测试空值
+        "rent_estimate_1br": None,
+        "rent_estimate_2br": None
+    },
+)
 
 @pytest.fixture(scope="session")
 def config() -> Config:
     """Create configuration for testing."""
+    # from_env 负责读取 .env，且结果已缓存，这里无需再调用 load_dotenv
     return Config.from_env(".env")
 
 @pytest.fixture(scope="session")
-def supabase_client(config: Config) -> SupabaseClient:
+def supabase_client(config: Config) -> RentEstimatesClient:
     """Create Supabase client for testing."""
-    return SupabaseClient(
+    return RentEstimatesClient(
         url=config.supabase_url,
         key=config.supabase_service_role_key
     )
 
-def test_connection(supabase_client: SupabaseClient) -> None:
+def test_connection(supabase_client: RentEstimatesClient) -> None:
     """Test database connection."""
     # 使用 service_role_key 创建客户端
     print("Testing database connection...")
@@ -36,56 +55,21 @@ def test_connection(supabase_client: SupabaseClient) -> None:
     assert result is not None
     print("Database connection successful!")
 
-def test_update_logic(supabase_client: SupabaseClient) -> None:
+def test_update_logic(supabase_client: RentEstimatesClient) -> None:
     """Test data update logic."""
-    # 准备测试数据
-    test_data = [
-        {
-            "location_name": "Test City 1",
-            "location_type": "city",
-            "location_fips_code": "12345",
-            "rent_estimate": 1500.0,
-            "year": 2024,
-            "month": 1
-        },
-        {
-            "location_name": "Test City 2",
-            "location_type": "city",
-            "location_fips_code": "67890",
-            "rent_estimate": None,  # 测试空值
-            "year": 2024,
-            "month": 1
-        }
-    ]
-    
-    # 测试插入数据
+    # 测试插入数据：整批一次请求写入
     print("Testing data insertion...")
-    result = supabase_client.execute_sql(
-        """
-        INSERT INTO apartment_list_rent_estimates 
-        (location_name, location_type, location_fips_code, rent_estimate, year, month)
-        VALUES 
-        (:location_name, :location_type, :location_fips_code, :rent_estimate, :year, :month)
-        ON CONFLICT (location_fips_code, year, month) 
-        DO UPDATE SET
-        rent_estimate = EXCLUDED.rent_estimate
-        WHERE apartment_list_rent_estimates.rent_estimate IS NULL 
-        OR apartment_list_rent_estimates.rent_estimate < EXCLUDED.rent_estimate
-        RETURNING *;
-        """,
-        params=test_data[0]
-    )
-    assert result is not None
-    print("Data insertion successful!")
+    try:
+        count = supabase_client.insert_records(list(TEST_RECORDS))
+        assert count == len(TEST_RECORDS)
+        print("Data insertion successful!")
+    finally:
+        # Remove the test rows so they do not feed the views
+        supabase_client.client.table(supabase_client.TABLE_NAME).delete().in_(
+            'location_fips_code', [record["location_fips_code"] for record in TEST_RECORDS]
+        ).execute()
+        supabase_client.invalidate_latest()
 
 if __name__ == "__main__":
-    # 设置测试环境
-    config = Config.from_env(".env")
-    client = SupabaseClient(
-        url=config.supabase_url,
-        key=config.supabase_service_role_key
-    )
-    
-    # 运行测试
-    test_connection(client)
-    test_update_logic(client) 
\ No newline at end of file
+    # 通过 pytest 运行，复用 session 级别的 supabase_client fixture
+    raise SystemExit(pytest.main([__file__, "-s"])) 
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""Helpers shared by the time on market test modules."""
+
+import os
+import stat
+from pathlib import Path
+from typing import List, Tuple
+
+import pyarrow.csv as pacsv
+
+# Metadata columns every time on market CSV must have; the rest are YYYY_MM columns
+REQUIRED_COLS = frozenset({
+    'location_name', 'location_type', 'location_fips_code',
+    'population', 'state', 'county', 'metro'
+})
+
+# Per-worker suffix for files written by tests, so parallel runs (pytest -n) do not collide
+WORKER_ID = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+
+def read_csv_head(path: Path) -> Tuple[List[str], int]:
+    """Read a CSV's column names and the row count of its first block without parsing the rest."""
+    reader = pacsv.open_csv(path)
+    try:
+        return reader.schema.names, reader.read_next_batch().num_rows
+    except StopIteration:
+        return reader.schema.names, 0
+
+
+class FileAssertionsMixin:
+    """File assertions for TestCase classes."""
+    
+    def _assert_nonempty_file(self, path: Path) -> None:
+        """Assert that path is an existing, non-empty regular file, using a single stat call."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self.fail(f"File does not exist: {path}")
+        self.assertTrue(stat.S_ISREG(st.st_mode), f"Not a regular file: {path}")
+        self.assertGreater(st.st_size, 0)
@@ -0,0 +1,71 @@
+"""Tests for how the base client serializes upsert batches."""
+
+import json
+import sys
+from pathlib import Path
+from unittest import TestCase, main
+from unittest.mock import patch
+
+import pandas as pd
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.database import TimeOnMarketClient
+from src.utils.batching import to_records
+
+# Two rows, one without a population, so pandas reads the column as float64
+TEST_DATA = {
+    'location_name': ('Test City 1', 'Test City 2'),
+    'location_type': ('City', 'City'),
+    'location_fips_code': ('12345', '67890'),
+    'population': (1000, None),
+    'state': ('CA', 'NY'),
+    'county': ('Test County 1', 'Test County 2'),
+    'metro': ('Test Metro 1', 'Test Metro 2'),
+    'year_month': ('2024_01', '2024_01'),
+    'time_on_market': (30.5, 25.7)
+}
+
+
+class TestIntegerColumns(TestCase):
+    """Integer columns must reach Postgres as integers even when pandas made them floats."""
+
+    def setUp(self):
+        """Create a client without connecting to Supabase."""
+        with patch('src.database.base.base_client._get_shared_client'):
+            self.client = TimeOnMarketClient(url="https://example.supabase.co", key="test-key")
+        df = pd.DataFrame({col: list(values) for col, values in TEST_DATA.items()})
+        self.assertEqual(df['population'].dtype, 'float64')
+        self.records = to_records(df)
+
+    def test_raw_sql_payload_has_integer_population(self):
+        """The raw_sql upsert sends 1000, not 1000.0, for a NaN-widened population column."""
+        self.client._upsert_function_missing = True
+        head, tail = self.client._upsert_statement_parts()
+        with patch.object(self.client, 'execute_sql') as execute_sql:
+            self.client.upsert_records(self.records)
+
+        statement = execute_sql.call_args.args[0]
+        payload = statement[len(head):-len(tail)].replace("''", "'")
+        self.assertNotIn('1000.0', payload)
+        self.assertEqual([row['population'] for row in json.loads(payload)], [1000, None])
+
+        # The caller's records are left as they were
+        self.assertIsInstance(self.records[0]['population'], float)
+
+    def test_function_rows_have_integer_population(self):
+        """The positional row arrays sent to UPSERT_FUNCTION carry 1000, not 1000.0."""
+        with patch.object(self.client, '_rpc') as rpc:
+            self.client.upsert_records(self.records)
+
+        function, params = rpc.call_args.args
+        self.assertEqual(function, self.client.UPSERT_FUNCTION)
+        self.assertNotIn('1000.0', params['payload'])
+        population_index = self.client.INSERT_COLUMNS.index('population')
+        rows = json.loads(params['payload'])
+        self.assertEqual([row[population_index] for row in rows], [1000, None])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Tests for picking the newest processed data file."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase, main
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.scripts._latest import latest_processed
+
+PATTERN = "rent_estimates_processed_*"
+
+
+class TestLatestProcessed(TestCase):
+    """The newest file wins across .parquet and .csv."""
+
+    def setUp(self):
+        """Create an empty data directory."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        """Remove the data directory."""
+        self._tmp.cleanup()
+
+    def _touch(self, name: str, mtime: float) -> Path:
+        """Create a file with the given modification time."""
+        path = self.data_dir / name
+        path.write_bytes(b"x")
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_newer_csv_beats_older_parquet(self):
+        """A CSV written after the last Parquet file is imported."""
+        self._touch("rent_estimates_processed_20240101_000000.parquet", 1000)
+        csv_file = self._touch("rent_estimates_processed_20240201_000000.csv", 2000)
+        self.assertEqual(latest_processed(self.data_dir, PATTERN), csv_file)
+
+    def test_parquet_preferred_within_one_run(self):
+        """A Parquet file and its CSV copy from one run resolve to the Parquet file."""
+        parquet_file = self._touch("rent_estimates_processed_20240201_000000.parquet", 2000)
+        self._touch("rent_estimates_processed_20240201_000000.csv", 2001)
+        self.assertEqual(latest_processed(self.data_dir, PATTERN), parquet_file)
+
+    def test_single_suffix_and_empty(self):
+        """Either suffix alone is found, and an empty directory gives None."""
+        self.assertIsNone(latest_processed(self.data_dir, PATTERN))
+        csv_file = self._touch("rent_estimates_processed_20240101_000000.csv", 1000)
+        self.assertEqual(latest_processed(self.data_dir, PATTERN), csv_file)
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,13 @@
 """Tests for time on market data scraping."""
 
 import logging
-import os
 import sys
 from pathlib import Path
 from unittest import TestCase, main
 
+import numpy as np
 import pandas as pd
+import pytest
 from dotenv import load_dotenv
 
 # Add project root to Python path
@@ -16,6 +17,7 @@ sys.path.append(str(project_root))
 from src.scrapers.apartment_list.time_on_market_scraper import TimeOnMarketScraper
 from src.utils.config import Config
 from src.utils.exceptions import ScrapingError
+from tests.helpers import REQUIRED_COLS, WORKER_ID, FileAssertionsMixin, read_csv_head
 
 # Configure logging
 logging.basicConfig(
@@ -25,7 +27,11 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-class TestTimeOnMarketScraper(TestCase):
+
+# The tests share the cached page source and write scraper output named by the second,
+# so under pytest -n --dist loadgroup they stay on one worker
+@pytest.mark.xdist_group("tom_scraper")
+class TestTimeOnMarketScraper(FileAssertionsMixin, TestCase):
     """Test cases for time on market scraper."""
     
     @classmethod
@@ -45,27 +51,44 @@ class TestTimeOnMarketScraper(TestCase):
         logs_dir = Path("logs")
         logs_dir.mkdir(exist_ok=True)
         
-    def setUp(self):
-        """Set up test case."""
-        self.scraper = TimeOnMarketScraper(self.config)
+        # Create one scraper for all tests; it reuses the shared HTTP session
+        cls.scraper = TimeOnMarketScraper(cls.config)
+        
+        # Page source and CSV URL, fetched by the first test that needs them
+        cls._cached_page_source = None
+        cls._cached_csv_url = None
+        
+    def _page_source(self) -> str:
+        """Get the page source, fetching it only once per test class."""
+        cls = type(self)
+        if cls._cached_page_source is None:
+            cls._cached_page_source = self.scraper._get_page_source()
+        return cls._cached_page_source
+        
+    def _csv_url(self) -> str:
+        """Get the CSV URL extracted from the cached page source."""
+        cls = type(self)
+        if cls._cached_csv_url is None:
+            cls._cached_csv_url = self.scraper._extract_csv_url(self._page_source())
+        return cls._cached_csv_url
         
     def test_get_page_source(self):
         """Test getting page source."""
         try:
-            page_source = self.scraper._get_page_source()
+            page_source = self._page_source()
             
             # 验证返回的页面源代码
             self.assertIsInstance(page_source, str)
             self.assertGreater(len(page_source), 0)
             
             # 验证是否包含预期的HTML结构
-            self.assertIn("<html", page_source.lower())
-            self.assertIn("</html>", page_source.lower())
+            page_source_lower = page_source.lower()
+            self.assertIn("<html", page_source_lower)
+            self.assertIn("</html>", page_source_lower)
             
             # 验证是否保存了调试文件
             debug_file = Path("logs") / "time_on_market_response.html"
-            self.assertTrue(debug_file.exists())
-            self.assertGreater(debug_file.stat().st_size, 0)
+            self._assert_nonempty_file(debug_file)
             
             logger.info("Page source test passed")
             
@@ -75,11 +98,8 @@ class TestTimeOnMarketScraper(TestCase):
     def test_extract_csv_url(self):
         """Test extracting CSV URL from page source."""
         try:
-            # 首先获取页面源代码
-            page_source = self.scraper._get_page_source()
-            
-            # 提取CSV URL
-            csv_url = self.scraper._extract_csv_url(page_source)
+            # 提取CSV URL（基于缓存的页面源代码）
+            csv_url = self._csv_url()
             
             # 验证URL格式
             self.assertIsInstance(csv_url, str)
@@ -100,22 +120,20 @@ class TestTimeOnMarketScraper(TestCase):
         """Test downloading CSV file."""
         try:
             # 获取CSV URL
-            page_source = self.scraper._get_page_source()
-            csv_url = self.scraper._extract_csv_url(page_source)
+            csv_url = self._csv_url()
             
             # 设置测试输出路径
-            output_path = self.test_data_dir / "test_time_on_market.csv"
+            output_path = self.test_data_dir / f"test_time_on_market_{WORKER_ID}.csv"
             
             # 下载CSV文件
             self.scraper._download_csv(csv_url, output_path)
             
             # 验证文件是否下载成功
-            self.assertTrue(output_path.exists())
-            self.assertGreater(output_path.stat().st_size, 0)
+            self._assert_nonempty_file(output_path)
             
             # 验证文件是否可以作为CSV读取
-            df = pd.read_csv(output_path)
-            self.assertGreater(len(df), 0)
+            _, first_rows = read_csv_head(output_path)
+            self.assertGreater(first_rows, 0)
             
             logger.info("CSV download test passed")
             
@@ -126,7 +144,7 @@ class TestTimeOnMarketScraper(TestCase):
         """Test data validation."""
         try:
             # 创建测试数据
-            test_data = {
+            test_data = pd.DataFrame({
                 'location_name': [f'Test City {i}' for i in range(1, 101)],
                 'location_type': ['city'] * 100,
                 'location_fips_code': [str(i).zfill(5) for i in range(1, 101)],
@@ -134,17 +152,15 @@ class TestTimeOnMarketScraper(TestCase):
                 'state': ['CA', 'NY'] * 50,
                 'county': [f'Test County {i}' for i in range(1, 101)],
                 'metro': [f'Test Metro {i}' for i in range(1, 101)],
-            }
+            })
             
-            # 添加从2019年1月到2025年1月的时间列
-            for year in range(2019, 2026):
-                for month in range(1, 13):
-                    if year == 2025 and month > 1:  # 只到2025年1月
-                        break
-                    col = f'{year}_{str(month).zfill(2)}'
-                    test_data[col] = [30.5 + i * 0.1 for i in range(100)]
+            # 添加从2019年1月到2025年1月的时间列（每列取值相同，一次性生成整个矩阵）
+            time_cols = [f'{year}_{month:02d}' for year in range(2019, 2026) for month in range(1, 13)
+                         if not (year == 2025 and month > 1)]
+            values = np.arange(100, dtype=np.float64) * 0.1 + 30.5
+            time_data = pd.DataFrame(np.repeat(values[:, None], len(time_cols), axis=1), columns=time_cols)
             
-            test_df = pd.DataFrame(test_data)
+            test_df = pd.concat([test_data, time_data], axis=1)
             
             # 测试有效数据
             is_valid, error_msg = self.scraper._validate_data(test_df)
@@ -176,23 +192,18 @@ class TestTimeOnMarketScraper(TestCase):
             output_path = self.scraper.scrape()
             
             # 验证输出文件
-            self.assertTrue(output_path.exists())
-            self.assertGreater(output_path.stat().st_size, 0)
+            self._assert_nonempty_file(output_path)
             
             # 验证文件内容
-            df = pd.read_csv(output_path)
-            self.assertGreater(len(df), 0)
+            columns, first_rows = read_csv_head(output_path)
+            self.assertGreater(first_rows, 0)
             
             # 验证必需的列
-            required_cols = [
-                'location_name', 'location_type', 'location_fips_code',
-                'population', 'state', 'county', 'metro'
-            ]
-            for col in required_cols:
-                self.assertIn(col, df.columns)
+            missing = REQUIRED_COLS - set(columns)
+            self.assertFalse(missing, f"Missing required columns: {sorted(missing)}")
                 
             # 验证时间序列列（YYYY_MM格式）
-            time_cols = [col for col in df.columns if col not in required_cols]
+            time_cols = [col for col in columns if col not in REQUIRED_COLS]
             self.assertGreater(len(time_cols), 0)
             
             logger.info("Complete scraping workflow test passed")